@@ -1,7 +1,8 @@
 from entity import Entity, Pathfinding
-from shapely.geometry import Polygon, Point
 from event import AttackEvent, DeathEvent, InteractionEvent
-import random, math
+from vision import cast_rays_batch, get_passable_grid
+from fog import FogOfWar, ExplorationFrontier, ring_chunks
+import math
 
 class PNJ(Entity):
     def __init__(self, x, y, world, size=1.75, speed=1.0):
@@ -14,64 +15,46 @@ class PNJ(Entity):
         self.behavior_manager = BehaviorManager(self)
         self.memory = PNJMemory(self)  # Mémoire pour stocker les emplacements des ressources
         
-        self.needs = {'hunger': 100, 'thirst': 100, 'energy': 100}
+        self.needs = world.needs.allocate(self)  # Ligne de la matrice des besoins partagée par le monde
         self.target_location = None
         self.actual_chunk = None
-        self.actual_chunk_poly = None
         self.path = None
+        self.visible_tiles = None  # Tuiles vues au dernier tick (coordonnées globales)
+        self.vision_hits = []  # Points d'impact des rayons de vision
 
     def init_name(self):
         """Initialise le nom du PNJ."""
         names = [("Alice", "F", (100,20,150)), ("Bob", "M", (20,100,150)), ("Charlie", "M", (150,20,100)), ("Daisy", "F", (40,200,70)), ("Eve", "F", (200,200,20)), ("Frank", "M", (200,100,20)), ("Grace", "F", (20,200,200)), ("Hank", "M", (200,20,200)), ("Ivy", "F", (100,200,20))]
-        name = random.choice(names)
+        name = self.world.rng.choice(names)
         self.color = name[2]
         return name[0]
     
     def update(self, delta_time):
         """Met à jour l'état du PNJ, gère les besoins et exécute des tâches."""
         self.check_pnj_in_chunk()
-        self.update_needs(delta_time)
         self.behavior_manager.update_behavior(delta_time)
         super().move(delta_time)
         
         # Explorer la zone autour pour détecter des ressources
         self.explore_and_memorize_view()
 
-    def update_needs(self, delta_time):
-        """Diminue les besoins du PNJ au fil du temps."""
-        self.needs['hunger'] -= delta_time * 0.3
-        self.needs['thirst'] -= delta_time * 0.4
-        self.needs['energy'] -= delta_time * 0.05
-
     def explore_and_memorize_view(self):
         """Utilise le champ de vision pour mémoriser les zones visibles."""
         self.memory.memorize_chunk(self.actual_chunk.x, self.actual_chunk.y)
+        if self.visible_tiles is not None and len(self.visible_tiles):
+            # Mémoriser les chunks dont au moins une tuile est visible
+            for chunk_x, chunk_y in self.memory.fog.mark_visible(self.visible_tiles):
+                self.memory.memorize_chunk(chunk_x, chunk_y)
+
+    def set_vision(self, visible_tiles, hit_points):
+        """Enregistre le résultat du lancer de rayons groupé du tick."""
+        self.visible_tiles = visible_tiles
+        self.vision_hits = hit_points
 
     def cast_rays(self, vision_range, angle):
         """Retourne une liste de points visibles en utilisant un casting de rayons."""
-        visible_points = []
-        step_angle = 5  # Étape de l'angle pour chaque rayon
-        half_angle = int(angle / 2)  # Convertir en entier
-
-        for i in range(-half_angle, half_angle + 1, step_angle):
-            rad_angle = math.radians(i)
-            dir_x = self.direction[0] * math.cos(rad_angle) - self.direction[1] * math.sin(rad_angle)
-            dir_y = self.direction[0] * math.sin(rad_angle) + self.direction[1] * math.cos(rad_angle)
-            point = self.cast_single_ray(dir_x, dir_y, vision_range)
-            if point:
-                visible_points.append(point)
-        
-        return visible_points
-
-    def cast_single_ray(self, dir_x, dir_y, range_vision):
-        """Simule un seul rayon dans une direction donnée jusqu'à une distance maximale."""
-        x, y = self.x, self.y
-        for i in range(range_vision):
-            x += dir_x
-            y += dir_y
-            if not self.is_passable(x, y):
-                return (x, y)
-        return (x, y)
+        _, hit_points = cast_rays_batch(self.world, [self], ranges=[vision_range], angles=[angle])[0]
+        return hit_points
 
     def is_passable(self, x, y):
         """Vérifie si la tuile à la position (x, y) est passable."""
@@ -79,24 +62,20 @@ class PNJ(Entity):
         local_x = int(x % self.config['chunk_size'])
         local_y = int(y % self.config['chunk_size'])
         if 0 <= local_x < self.config['chunk_size'] and 0 <= local_y < self.config['chunk_size']:
-            tile = chunk.tiles[local_x][local_y]
-            return tile.biome not in ['Water','Mountains']
+            return bool(get_passable_grid(self.world.biomes, chunk)[local_x, local_y])
         return False
     
     def is_in_chunk(self, x, y):
         """Vérifie si une position spécifique est dans le chunk actuel du PNJ."""
-        if not self.actual_chunk_poly:
+        if not self.actual_chunk:
             return False
-        return self.actual_chunk_poly.contains(Point(x, y))
+        chunk_size = self.config['chunk_size']
+        return int(x // chunk_size) == self.actual_chunk.x and int(y // chunk_size) == self.actual_chunk.y
     
     def set_chunk_actual(self):
         """Définit le chunk actuel du PNJ en fonction de sa position actuelle."""
         chunk_x = int(self.x // self.config['chunk_size'])
         chunk_y = int(self.y // self.config['chunk_size'])
-        chunk_size = self.config['chunk_size']
-        self.actual_chunk_poly = Polygon([(chunk_x, chunk_y), (chunk_x * chunk_size + chunk_size, chunk_y),
-                                     (chunk_x * chunk_size + chunk_size, chunk_y * chunk_size + chunk_size),
-                                     (chunk_x, chunk_y * chunk_size + chunk_size)])
         self.actual_chunk = self.world.get_chunk(chunk_x, chunk_y)
     
     def check_pnj_in_chunk(self):
@@ -131,8 +110,10 @@ class PNJ(Entity):
                     self.vx = dir_x * self.speed
                     self.vy = dir_y * self.speed
                 else:
-                    # Si le chemin n'est pas passable, éviter l'obstacle
-                    self.path = self.pathfinder.a_star((self.x, self.y), target, self.vision_range)
+                    # Si le chemin n'est pas passable, demander un chemin en arrière-plan
+                    # et continuer à contourner l'obstacle en attendant le résultat
+                    self.request_path(target)
+                    self.steer_around_obstacle()
             else:
                 # Si déjà à la cible, arrêter le PNJ
                 self.vx = 0
@@ -141,6 +122,32 @@ class PNJ(Entity):
             self.vx = 0
             self.vy = 0
     
+    def request_path(self, target):
+        """Demande un chemin A* vers la cible au service de pathfinding, sans bloquer le tick."""
+        path_service = self.world.path_service
+        if path_service.is_pending(self):
+            return
+        path_service.request_path(self, (self.x, self.y), target, self.vision_range, self.set_path)
+
+    def set_path(self, path):
+        """Callback du service de pathfinding : applique le chemin calculé."""
+        if not self.target_location:
+            return  # La tâche a été abandonnée pendant le calcul
+        self.path = path if path else None
+        if not path and self.memory.frontier.report_failure(self.target_location):
+            self.target_location = None  # Entrée de frontière inaccessible : l'exploration passe à la suivante
+
+    def steer_around_obstacle(self):
+        """Oriente le PNJ vers la direction passable la plus proche de la cible."""
+        dx, dy = self.avoid_obstacle()
+        length = math.sqrt(dx ** 2 + dy ** 2)
+        if length > 0:
+            self.vx = dx / length * self.speed
+            self.vy = dy / length * self.speed
+        else:
+            self.vx = 0
+            self.vy = 0
+
     def follow_path(self):
         """Déplace le PNJ le long du chemin calculé par l'algorithme A*."""
         if self.path:
@@ -188,25 +195,9 @@ class PNJ(Entity):
 
         return best_direction
 
-    def get_random_target(self):
-        """Génère une position cible aléatoire dans le monde, privilégiant les chunks non connus."""
-        max_attempts = 100  # Nombre maximum de tentatives pour trouver un chunk non connu
-        for _ in range(max_attempts):
-            target_x = random.randint(int(self.x - self.vision_range), int(self.x + self.vision_range))
-            target_y = random.randint(int(self.y - self.vision_range), int(self.y + self.vision_range))
-            chunk_x = target_x // self.config['chunk_size']
-            chunk_y = target_y // self.config['chunk_size']
-            if not self.memory.is_chunk_known(chunk_x, chunk_y):
-                if self.is_passable(target_x, target_y):
-                    return (target_x, target_y)
-                
-        # Si toutes les tentatives échouent, retourner une position aléatoire
-        target = (random.randint(int(self.x - self.vision_range), int(self.x + self.vision_range)),
-                  random.randint(int(self.y - self.vision_range), int(self.y + self.vision_range)))
-        while not self.is_passable(target[0], target[1]):
-            target = (random.randint(int(self.x - self.vision_range), int(self.x + self.vision_range)),
-                      random.randint(int(self.y - self.vision_range), int(self.y + self.vision_range)))
-        return target
+    def get_exploration_target(self):
+        """Retourne l'entrée de la frontière d'exploration la plus proche, ou None s'il n'y a plus rien à explorer."""
+        return self.memory.frontier.next_target(self.x, self.y)
     
     def is_at_target(self,target=None, threshold=0.1):
         """Vérifie si le PNJ est à la position cible."""
@@ -234,6 +225,15 @@ class BehaviorManager:
     def __init__(self, pnj):
         self.pnj = pnj
         self.current_task = None
+        self.best_action = 'explore'  # Meilleure action selon les utilités calculées par le monde
+
+    def on_best_action_changed(self, action):
+        """Appelée par le monde quand la meilleure action du PNJ change ; une exploration en cours est abandonnée."""
+        self.best_action = action
+        if isinstance(self.current_task, ExploreTask) and action != 'explore':
+            self.pnj.target_location = None
+            self.pnj.path = None
+            self.current_task = None
 
     def update_behavior(self, delta_time):
         """Gère les comportements basés sur les besoins et l'environnement."""
@@ -247,10 +247,10 @@ class BehaviorManager:
 
     def decide_next_task(self):
         """Décide de la prochaine tâche en fonction des besoins et de la mémoire."""
-        if self.pnj.needs['thirst'] < 40 and self.pnj.memory.has_resource('Water'):
+        if self.best_action == 'drink':
             print(f"{self.pnj.name} a soif !")
             return DrinkTask(self.pnj)
-        elif self.pnj.needs['hunger'] < 30:
+        elif self.best_action == 'eat':
             print(f"{self.pnj.name} a faim !")
             return EatTask(self.pnj)
         else:
@@ -272,6 +272,19 @@ class DrinkTask(Task):
         super().__init__(pnj)
         self.target = None
         self.pnj = pnj
+        self.field = pnj.world.flow_fields.get_field('Water')
+        self.use_flow_field = False
+    
+    def find_target(self):
+        """Retourne l'accès à l'eau le plus proche, via la carte de distances si sa source est connue."""
+        source = self.field.nearest_source(self.pnj.x, self.pnj.y)
+        if source:
+            chunk_size = self.pnj.config['chunk_size']
+            if self.pnj.memory.is_chunk_known(source[0] // chunk_size, source[1] // chunk_size):
+                self.use_flow_field = True
+                self.pnj.path = None
+                return (source[0] + 0.5, source[1] + 0.5)
+        return self.pnj.memory.get_resource('Water')
         
     def execute(self, delta_time):
         if not self.pnj.memory.has_resource('Water'):
@@ -279,10 +292,15 @@ class DrinkTask(Task):
         else:
             # Trouve la ressource en eau la plus proche
             if not self.target:
-                self.target = self.pnj.memory.get_resource('Water')
+                self.target = self.find_target()
                 self.pnj.target_location = self.target
             
-            self.pnj.move_to()
+            # Suivre la carte de distances partagée si la cible en provient, sinon A*
+            step = self.field.get_next_step(self.pnj.x, self.pnj.y) if self.use_flow_field else None
+            if step:
+                self.pnj.calculate_velocity((step[0] + 0.5, step[1] + 0.5))
+            else:
+                self.pnj.move_to()
             if self.pnj.is_at_target():
                 self.pnj.consume_water(delta_time)
                 if self.pnj.needs['thirst'] >= 100:
@@ -296,6 +314,7 @@ class EatTask(Task):
         self.pnj = pnj
         self.attack_cooldown = 0  # Temps restant avant la prochaine attaque
         self.attack_delay = 2  # Délai entre les attaques en secondes
+        self.alert_radius = 8  # Rayon dans lequel les autres animaux perçoivent l'attaque
     
     def execute(self, delta_time):
         if not self.pnj.memory.has_resource('Food') and not self.target:
@@ -331,11 +350,12 @@ class EatTask(Task):
         if self.target:
             distance = math.sqrt((self.pnj.x - self.target.x) ** 2 + (self.pnj.y - self.target.y) ** 2)
             if distance < 2:
-                if self.attack_cooldown <= 0:
-                    self.pnj.event_manager.emit_event(AttackEvent(self.pnj, self.target, 10))
+                if self.target.health <= 0:
+                    # Les dégâts sont appliqués à la distribution des événements, en fin de tick
+                    self.food = True
+                elif self.attack_cooldown <= 0:
+                    self.pnj.event_manager.emit_event(AttackEvent(self.pnj, self.target, 10, radius=self.alert_radius))
                     self.attack_cooldown = self.attack_delay  # Réinitialiser le délai d'attaque
-                    if self.target.health <= 0:
-                        self.food = True
                 else:
                     self.attack_cooldown -= delta_time  # Décrémenter le délai d'attaque
             
@@ -345,63 +365,85 @@ class EatTask(Task):
 class ExploreTask(Task):
     def execute(self, delta_time):
         if self.pnj.is_at_target():
+            # Si le chunk visé n'a pas été découvert depuis l'entrée, elle est pénalisée
+            self.pnj.memory.frontier.report_failure(self.pnj.target_location)
             self.complete = True
             self.pnj.target_location = None
         elif not self.pnj.target_location:
-            self.pnj.target_location = self.pnj.get_random_target()
+            self.pnj.target_location = self.pnj.get_exploration_target()
+            if not self.pnj.target_location:
+                self.complete = True  # Aucune frontière atteignable
         else:
             self.pnj.move_to()
 
 class PNJMemory:
     def __init__(self, pnj):
-        """Mémoire des PNJ pour stocker les chunks découverts."""
-        self.discovered_chunks = set()  # Ensemble des coordonnées des chunks connus
-        self.resources = {}  # Dictionnaire des ressources connues
+        """Mémoire des PNJ : identifiants des chunks connus, dont les faits sont partagés par le monde."""
+        self.knowledge = pnj.world.knowledge
+        self.known_ids = set()  # Identifiants des chunks connus dans la base de connaissances
+        self.fog = FogOfWar(pnj.config['chunk_size'])  # Bitmaps des chunks découverts et des tuiles vues
+        self.frontier = ExplorationFrontier(pnj.world, self.fog)  # Chunks inconnus bordant la zone connue
+        self.resource_counts = {}  # Ressource -> nombre de chunks connus qui en contiennent
         self.pnj = pnj
+        self.chunk_size = pnj.config['chunk_size']
 
     def memorize_chunk(self, chunk_x, chunk_y):
         """Mémorise la position d'un chunk découvert."""
-        if self.discovered_chunks:
-            if (chunk_x, chunk_y) not in self.discovered_chunks:
-                self.discovered_chunks.add((chunk_x, chunk_y))
-                self.memorize_resource(self.pnj.world.get_chunk(chunk_x, chunk_y))
-        else:
-            self.discovered_chunks.add((chunk_x, chunk_y))
-            self.memorize_resource(self.pnj.world.get_chunk(chunk_x, chunk_y))
-
-    def memorize_resource(self, chunk):
-        """Mémorise la position d'une ressource spécifique."""
-        for resource, tiles in chunk.biome_info.items():
-            if resource in self.resources:
-                self.resources[resource].update(tiles)
-            else:
-                self.resources[resource] = set(tiles)
+        if self.fog.mark_chunk(chunk_x, chunk_y):
+            self.frontier.add_known_chunk(chunk_x, chunk_y)
+            chunk_id = self.knowledge.register(chunk_x, chunk_y)
+            self.known_ids.add(chunk_id)
+            self.memorize_resource(self.knowledge.get_facts(chunk_id))
+
+    def memorize_resource(self, facts):
+        """Comptabilise les ressources d'un chunk connu (leurs tuiles restent dans la base partagée)."""
+        for resource in facts.resources:
+            self.resource_counts[resource] = self.resource_counts.get(resource, 0) + 1
+            if self.resource_counts[resource] == 1:
+                self.pnj.world.needs.set_known(self.pnj.needs.slot, resource)
 
     def is_chunk_known(self, chunk_x, chunk_y):
         """Vérifie si un chunk spécifique est déjà connu."""
-        return (chunk_x, chunk_y) in self.discovered_chunks
+        return self.fog.is_chunk_known(chunk_x, chunk_y)
 
     def get_all_discovered_chunks(self):
         """Retourne la liste des chunks découverts."""
-        return list(self.discovered_chunks)
+        return [(self.knowledge.get_facts(chunk_id).x, self.knowledge.get_facts(chunk_id).y) for chunk_id in self.known_ids]
 
     def has_resource(self, resource_type):
         """Vérifie si une ressource spécifique est connue."""
-        return resource_type in self.resources
+        return resource_type in self.resource_counts
 
     def find_resource(self, resource_type):
         """Retourne la position la plus proche de la ressource spécifique."""
-        if resource_type in self.resources:
+        if resource_type in self.resource_counts:
             min_distance = float('inf')
             min_position = None
-            for position in self.resources[resource_type]:
-                distance = math.sqrt((self.pnj.x - position[0]) ** 2 + (self.pnj.y - position[1]) ** 2)
-                if distance < min_distance:
-                    min_distance = distance
-                    min_position = position
+            # Si le PNJ se trouve déjà sur la ressource, sa propre tuile convient (les index ne contiennent que les bordures)
+            tile = self.pnj.world.get_tile_at(self.pnj.x, self.pnj.y)
+            if tile.biome == resource_type and self.is_chunk_known(int(self.pnj.x // self.chunk_size), int(self.pnj.y // self.chunk_size)):
+                return self.accessible_resource((tile.x, tile.y))
+            # Parcours des anneaux de chunks autour du PNJ, du plus proche au plus lointain
+            center_x = int(self.pnj.x // self.chunk_size)
+            center_y = int(self.pnj.y // self.chunk_size)
+            ring = 0
+            while (ring - 1) * self.chunk_size <= min_distance:
+                for chunk_x, chunk_y in ring_chunks(center_x, center_y, ring):
+                    chunk_id = self.knowledge.get_id(chunk_x, chunk_y)
+                    if chunk_id is None or chunk_id not in self.known_ids:
+                        continue
+                    facts = self.knowledge.get_facts(chunk_id)
+                    if resource_type not in facts.resources:
+                        continue
+                    for position in facts.summary[resource_type]:
+                        distance = math.sqrt((self.pnj.x - position[0]) ** 2 + (self.pnj.y - position[1]) ** 2)
+                        if distance < min_distance:
+                            min_distance = distance
+                            min_position = position
+                ring += 1
             return self.accessible_resource(min_position)
         return None
-    
+
     def accessible_resource(self, target):
         """Retourne une position accessible à partir de la position cible."""
         directions = [(1, 0), (-1, 0), (0, 1), (0, -1)]
@@ -414,7 +456,7 @@ class PNJMemory:
     
     def get_resource(self, resource_type):
         """Retourne la position de la ressource spécifique."""
-        if resource_type in self.resources:
+        if resource_type in self.resource_counts:
             return self.find_resource(resource_type)
         return None
 
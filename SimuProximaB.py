@@ -1,8 +1,9 @@
-import pygame, random, json, threading, time
+import pygame, json, threading, time, argparse
 from moteurGraphique import Camera, World
 from entity import Food, Animal
 from PNJ import PNJ
 from event import EventManager
+from replay import Recorder
 
 # Charger la configuration depuis un fichier JSON
 def load_config(file_path):
@@ -20,13 +21,12 @@ def handle_entity_hover_and_click(world, camera):
 
     hovered_entity = None
 
-    # Parcourir toutes les entités pour vérifier si la souris survole l'une d'elles
-    for entity_list in world.entities.values():
-        for entity in entity_list:
-            # Vérifier si la souris est sur l'entité
-            if entity.x - entity.size / 2 <= world_mouse_x <= entity.x + entity.size / 2 and entity.y - entity.size / 2 <= world_mouse_y <= entity.y + entity.size / 2:
-                hovered_entity = entity
-                break  # On peut sortir si une entité est trouvée
+    # Parcourir les entités de l'instantané affiché pour vérifier si la souris survole l'une d'elles
+    for state, x, y in world.snapshots.interpolate()[1]:
+        # Vérifier si la souris est sur l'entité, à la position où elle est dessinée
+        if x - state.size / 2 <= world_mouse_x <= x + state.size / 2 and y - state.size / 2 <= world_mouse_y <= y + state.size / 2:
+            hovered_entity = state.entity
+            break  # On peut sortir si une entité est trouvée
 
     # Si une entité est survolée, afficher ses informations en haut à gauche
     if hovered_entity :
@@ -48,30 +48,25 @@ def display_entity_info(entity, camera):
     """Affiche les informations d'une entité survolée."""
     name = entity.name
     info = f"PNJ {name} - ({entity.x:.2f}, {entity.y:.2f})"
-    font = camera.font
     
     # Récupérer dynamiquement tous les attributs potentiels comme énergie, faim, soif, etc.
     for need, value in entity.needs.items():
         info += f" {need.capitalize()}: {value:.2f}"
     
-    # Afficher les informations
-    text = font.render(info, True, (255, 255, 255))
-    camera.screen.blit(text, (10, 10))
-    #pygame.display.flip()
+    # Afficher les informations (au prochain rendu de la caméra)
+    camera.draw_text("entity_info", info, (10, 10), refresh=camera.hud_refresh_interval)
 
 def display_performance_info(monitor, camera):
     """Affiche les informations de performance des systèmes surveillés."""
     performance_info = monitor.get_elapsed_time("all")
     y_offset = 10
     x_offset = camera.screen_width - 200
-    font = camera.font
     
     for system_name, elapsed_time in performance_info.items():
         fps = 1 / elapsed_time if elapsed_time > 0 else 0
         text = f"{system_name}: {int(fps)} FPS"
         color = (255, 0, 0) if monitor.is_slow(system_name) else (255, 255, 255)
-        text = font.render(text, True, color)
-        camera.screen.blit(text, (x_offset, y_offset))
+        camera.draw_text(("performance", system_name), text, (x_offset, y_offset), color, refresh=camera.hud_refresh_interval)
         y_offset += 30
 
 def generate_food_in_world(world, max_food_per_chunk=5):
@@ -81,7 +76,7 @@ def generate_food_in_world(world, max_food_per_chunk=5):
                 food_count = sum(1 for tile in tiles if isinstance(tile.has_entity, Food))
                 if food_count >= max_food_per_chunk:
                     continue
-                if tile.biome == "Forest" and random.random() < 0.0001 and not tile.has_entity:
+                if tile.biome == "Forest" and world.rng.random() < 0.0001 and not tile.has_entity:
                     fruit = Food("Pomme", nutrition_value=20, x=tile.x, y=tile.y, world=world)
                     tile.set_entity_presence(fruit)
                     world.add_entity(fruit)
@@ -112,8 +107,8 @@ def generate_animals_in_world(world, max_animals_per_chunk=2, radius=1):
             continue
 
         # Génère une position aléatoire dans le chunk
-        x = random.randint(chunk.x_offset, chunk.x_offset + chunk.chunk_size - 1)
-        y = random.randint(chunk.y_offset, chunk.y_offset + chunk.chunk_size - 1)
+        x = world.rng.randint(chunk.x_offset, chunk.x_offset + chunk.chunk_size - 1)
+        y = world.rng.randint(chunk.y_offset, chunk.y_offset + chunk.chunk_size - 1)
         
         tile = chunk.tiles[x - chunk.x_offset][y - chunk.y_offset]
         
@@ -200,10 +195,14 @@ entity_lock = threading.Lock()
 
 # Exemple de gestionnaire de threads
 class Simulation:
-    def __init__(self, world, camera):
+    def __init__(self, world, camera, recorder=None):
         self.world = world
         self.camera = camera
         self.delta_time = 1/60
+        self.entity_delta_time = 0.05  # Pas de temps des entités
+        self.chunk_update_interval = 20  # Nombre de pas d'entités entre deux mises à jour des chunks (1 s)
+        self.recorder = recorder  # Si présent, la simulation tourne en pas à pas et est enregistrée
+        self.tick = 0
         self.is_running = True
         
         self.monitor = PerformanceMonitor()
@@ -219,6 +218,9 @@ class Simulation:
 
     def start_simulation(self):
         """Lancer les threads pour chaque module."""
+        if self.recorder:
+            self.run_recorded()
+            return
         threading.Thread(target=self.update_entities, daemon=True).start()
         threading.Thread(target=self.update_chunks, daemon=True).start()
         #threading.Thread(target=self.update_display, daemon=True).start()
@@ -246,6 +248,40 @@ class Simulation:
             time.sleep(1)  # Cycle plus lent car les chunks n'ont pas besoin de mises à jour rapides
             elapsed_time = self.monitor.stop('update_chunks')
 
+    def step(self):
+        """Un pas de simulation déterministe : chunks (toutes les secondes) puis entités.
+
+        Utilisé par l'enregistrement et par le rejeu (replay.py), qui doivent exécuter exactement la même séquence.
+        """
+        if self.tick % self.chunk_update_interval == 0:
+            generate_animals_in_world(self.world)
+        with entity_lock:
+            self.world.update_entities(self.entity_delta_time)
+        self.tick += 1
+
+    def run_recorded(self):
+        """Boucle pas à pas dans le thread principal : caméra, pas de simulation, rendu, le tout enregistré."""
+        self.monitor.set_threshold('MoteurGraphique', self.entity_delta_time * 2)
+        while self.is_running:
+            self.monitor.start('MoteurGraphique')
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT or (event.type == pygame.KEYDOWN and event.key == pygame.K_SPACE):
+                    self.stop_simulation()
+            if not self.is_running:
+                break
+
+            self.camera.update(self.entity_delta_time)
+            self.recorder.record_tick(self)
+            self.step()
+            handle_entity_hover_and_click(self.world, self.camera)
+            display_performance_info(self.monitor, self.camera)
+            pygame.display.update(self.camera.render())
+            time.sleep(self.entity_delta_time)
+            self.monitor.stop('MoteurGraphique')
+
+        self.recorder.close()
+        pygame.quit()
+
     def run_pygame(self):
         """Boucle principale de Pygame (doit être exécutée dans le thread principal)."""
         self.monitor.set_threshold('MoteurGraphique', self.delta_time * 2)
@@ -258,7 +294,6 @@ class Simulation:
                     self.stop_simulation()
 
             self.camera.update(self.delta_time)  # Mise à jour de la caméra
-            self.camera.render()
             
             # Gérer le survol des entités par la souris
             handle_entity_hover_and_click(self.world, self.camera)
@@ -266,7 +301,8 @@ class Simulation:
             # Afficher les informations de performance
             display_performance_info(self.monitor, self.camera)
             
-            pygame.display.flip()
+            # Seules les zones modifiées de l'écran sont repeintes et envoyées à l'affichage
+            pygame.display.update(self.camera.render())
             # Ajuster la vitesse de rendu (par ex., 60 FPS)
             time.sleep(self.delta_time)
             elapsed_time = self.monitor.stop('MoteurGraphique')
@@ -276,16 +312,23 @@ class Simulation:
     def stop_simulation(self):
         """Arrêter la simulation."""
         self.is_running = False
+        self.world.path_service.shutdown()
 
 import cProfile
 import pstats
 
 def main2():
+    parser = argparse.ArgumentParser(description="Simulation Proxima B.")
+    parser.add_argument("--record", help="Enregistrer la partie (pas à pas, déterministe) dans ce fichier")
+    parser.add_argument("--seed", type=int, help="Graine du générateur aléatoire du monde")
+    args = parser.parse_args()
+
     profiler = cProfile.Profile()
     profiler.enable()
     
     # Charger la configuration
     config = load_config('config.json')
+    recorder = Recorder(args.record) if args.record else None
     
     # Initialiser Pygame
     pygame.init()
@@ -294,10 +337,14 @@ def main2():
     event_manager = EventManager()
     
     # Créer le monde et la caméra
-    world = World(config, chunk_lock=chunk_lock, entity_lock=entity_lock, event_manager=event_manager)
+    world = World(config, chunk_lock=chunk_lock, entity_lock=entity_lock, event_manager=event_manager,
+                  seed=args.seed if args.seed is not None else config.get('simulation_seed'),
+                  deterministic=recorder is not None, recorder=recorder)
     camera = Camera(world, config, mode="free")
     
-    sim = Simulation(world, camera)
+    sim = Simulation(world, camera, recorder=recorder)
+    if recorder:
+        recorder.start(world, sim)
     sim.initialize_simulation()
     sim.start_simulation()
     
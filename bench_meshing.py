@@ -0,0 +1,143 @@
+"""
+Banc d'essai du greedy meshing des chunks : les trois implémentations historiques de Camera
+(greedy_mesh, greedy_mesh_optimized, greedy_mesh_chunk) comparées au maillage NumPy par plages
+(meshing.greedy_mesh_grid) utilisé désormais à la génération des chunks.
+
+Les chunks sont générés à partir de la graine Perlin de config.json (ou de celle passée en argument),
+de sorte que deux exécutions sur deux commits différents mesurent exactement la même charge. Chaque
+implémentation part de ce que la génération produit : les tuiles pour les versions historiques, la
+grille des identifiants de biome (remplie pendant la génération) pour la version NumPy. Chaque
+maillage est vérifié : ses rectangles doivent couvrir le chunk une seule fois, avec le bon biome.
+
+Exemples :
+    python bench_meshing.py --output bench_meshing.json
+    python bench_meshing.py --compare bench_meshing.json --threshold 0.2
+"""
+import argparse, json, os, statistics, subprocess, sys, tempfile, time
+import numpy as np
+from moteurGraphique import World, Camera, load_config
+from event import EventManager
+from meshing import greedy_mesh_grid
+
+def mesh_dict(tiles, implementation):
+    """Adapte une implémentation à base de dictionnaire (coordonnées globales -> tuile) à un chunk."""
+    return implementation(None, {(tile.x, tile.y): tile for row in tiles for tile in row})
+
+# Nom -> (fonction de maillage d'un chunk, coordonnées des rectangles relatives au chunk)
+IMPLEMENTATIONS = {
+    "greedy_mesh": (lambda chunk, biomes: mesh_dict(chunk.tiles, Camera.greedy_mesh), False),
+    "greedy_mesh_optimized": (lambda chunk, biomes: mesh_dict(chunk.tiles, Camera.greedy_mesh_optimized), False),
+    "greedy_mesh_chunk": (lambda chunk, biomes: Camera.greedy_mesh_chunk(None, chunk.tiles), True),
+    "greedy_mesh_grid": (lambda chunk, biomes: greedy_mesh_grid(biomes.get_chunk_ids(chunk)), True),
+}
+
+def build_world(config, seed, radius, chunk_file):
+    """Construit un monde déterministe sans toucher au cache de chunks du jeu."""
+    config = dict(config, perlin=dict(config['perlin'], seed=seed), initial_chunk_radius=radius)
+    return World(config, event_manager=EventManager(), chunk_file=chunk_file)
+
+def check_mesh(chunk, biomes, rectangles, local):
+    """Vérifie que les rectangles couvrent chaque tuile du chunk exactement une fois, avec son biome."""
+    ids = biomes.get_chunk_ids(chunk)
+    cover = np.zeros(ids.shape, dtype=int)
+    for x, y, width, height, biome in rectangles:
+        if not local:
+            x, y = x - chunk.x_offset, y - chunk.y_offset
+        biome_id = biome if isinstance(biome, (int, np.integer)) else biomes.get_id(biome)
+        if not (ids[x:x + width, y:y + height] == biome_id).all():
+            return False
+        cover[x:x + width, y:y + height] += 1
+    return bool((cover == 1).all())
+
+def run_implementation(chunks, biomes, name, repeat):
+    """Mesure une implémentation sur tous les chunks ; retourne les durées (ms) et le nombre de rectangles."""
+    function, local = IMPLEMENTATIONS[name]
+    times, rectangles, valid = [], [], True
+    for chunk in chunks:
+        best = float('inf')
+        for _ in range(repeat):
+            begin = time.perf_counter()
+            mesh = function(chunk, biomes)
+            best = min(best, time.perf_counter() - begin)
+        times.append(best * 1000)
+        rectangles.append(len(mesh))
+        valid = valid and check_mesh(chunk, biomes, mesh, local)
+    return times, rectangles, valid
+
+def summarize(times, rectangles, valid):
+    """Agrège les mesures d'une implémentation."""
+    ordered = sorted(times)
+    return {
+        "chunks": len(times),
+        "valid": valid,
+        "time_ms_mean": statistics.mean(times),
+        "time_ms_median": statistics.median(times),
+        "time_ms_p95": ordered[int(0.95 * (len(ordered) - 1))],
+        "rectangles_mean": statistics.mean(rectangles),
+    }
+
+def current_commit():
+    """Retourne le commit courant, si le banc est lancé depuis le dépôt git."""
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], stderr=subprocess.DEVNULL, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def compare(results, baseline, threshold):
+    """Affiche les écarts avec une exécution de référence ; retourne False en cas de régression."""
+    ok = True
+    for name, summary in results["summary"].items():
+        reference = baseline["summary"].get(name)
+        if not reference:
+            continue
+        for metric in ("time_ms_median", "rectangles_mean"):
+            old, new = reference[metric], summary[metric]
+            delta = (new - old) / old if old else 0.0
+            regression = delta > threshold
+            ok = ok and not regression
+            flag = "  REGRESSION" if regression else ""
+            print(f"{name:24s} {metric:16s} {old:10.3f} -> {new:10.3f} ({delta:+.1%}){flag}")
+        if reference["valid"] and not summary["valid"]:
+            ok = False
+            print(f"{name:24s} maillage invalide  REGRESSION")
+    return ok
+
+def main():
+    parser = argparse.ArgumentParser(description="Banc d'essai du greedy meshing des chunks.")
+    parser.add_argument("--config", default="config.json")
+    parser.add_argument("--seed", type=int, help="Graine Perlin (par défaut celle de la configuration)")
+    parser.add_argument("--radius", type=int, default=2, help="Rayon de chunks générés")
+    parser.add_argument("--repeat", type=int, default=3, help="Mesures par chunk (la meilleure est retenue)")
+    parser.add_argument("--only", nargs="*", choices=list(IMPLEMENTATIONS), help="Implémentations à mesurer")
+    parser.add_argument("--output", help="Fichier JSON où écrire les résultats")
+    parser.add_argument("--compare", help="Fichier JSON de référence à comparer")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Régression relative tolérée")
+    args = parser.parse_args()
+
+    config = load_config(args.config)
+    seed = args.seed if args.seed is not None else config['perlin']['seed']
+    results = {"commit": current_commit(), "seed": seed, "radius": args.radius, "repeat": args.repeat, "summary": {}}
+
+    with tempfile.TemporaryDirectory() as directory:
+        world = build_world(config, seed, args.radius, os.path.join(directory, "chunks.json"))
+        chunks = list(world.loaded_chunks.values())
+        for name in args.only or IMPLEMENTATIONS:
+            times, rectangles, valid = run_implementation(chunks, world.biomes, name, args.repeat)
+            results["summary"][name] = summary = summarize(times, rectangles, valid)
+            print(f"{name:24s} chunks={summary['chunks']:3d} médiane={summary['time_ms_median']:8.3f} ms "
+                  f"p95={summary['time_ms_p95']:8.3f} ms rectangles={summary['rectangles_mean']:6.1f} "
+                  f"{'ok' if valid else 'INVALIDE'}")
+        world.path_service.shutdown()
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+    if args.compare:
+        with open(args.compare, 'r') as f:
+            baseline = json.load(f)
+        if not compare(results, baseline, args.threshold):
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,197 @@
+"""
+Banc d'essai du pathfinding (A* + simplification) sur des scénarios de terrain reproductibles.
+
+Le monde est généré à partir de la graine Perlin de config.json (ou des graines passées en
+argument) et les couples départ/arrivée sont tirés avec une graine fixe, de sorte que deux
+exécutions sur deux commits différents mesurent exactement la même charge.
+
+Exemples :
+    python bench_pathfinding.py --output bench_pathfinding.json
+    python bench_pathfinding.py --compare bench_pathfinding.json --threshold 0.2
+"""
+import argparse, contextlib, io, json, math, os, random, statistics, subprocess, sys, tempfile, time
+from moteurGraphique import World, load_config
+from event import EventManager
+from entity import Pathfinding
+
+# Nom du scénario -> (distance minimale, distance maximale, biome devant croiser la ligne droite)
+SCENARIOS = {
+    "court": (5, 15, None),
+    "long": (40, 80, None),
+    "bloque_par_eau": (15, 60, "Water"),
+    "traverse_montagnes": (15, 60, "Mountains"),
+}
+
+def build_world(config, seed, radius, chunk_file):
+    """Construit un monde déterministe sans toucher au cache de chunks du jeu."""
+    config = dict(config, perlin=dict(config['perlin'], seed=seed), initial_chunk_radius=radius)
+    return World(config, event_manager=EventManager(), chunk_file=chunk_file)
+
+def line_biomes(world, start, goal):
+    """Retourne l'ensemble des biomes traversés par la ligne de Bresenham entre deux tuiles."""
+    x1, y1 = start
+    x2, y2 = goal
+    dx, dy = abs(x2 - x1), abs(y2 - y1)
+    sx = 1 if x1 < x2 else -1
+    sy = 1 if y1 < y2 else -1
+    err = dx - dy
+    biomes = set()
+    while True:
+        biomes.add(world.get_tile_at(x1, y1).biome)
+        if (x1, y1) == (x2, y2):
+            return biomes
+        e2 = err * 2
+        if e2 > -dy:
+            err -= dy
+            x1 += sx
+        if e2 < dx:
+            err += dx
+            y1 += sy
+
+def generate_pairs(world, pathfinder, scenario, count, rng, max_attempts=5000):
+    """Tire des couples départ/arrivée franchissables correspondant au scénario."""
+    min_distance, max_distance, crossed_biome = SCENARIOS[scenario]
+    chunk_size = world.config['chunk_size']
+    radius = world.config['initial_chunk_radius']
+    low, high = -radius * chunk_size, (radius + 1) * chunk_size - 1
+    pairs = []
+    for _ in range(max_attempts):
+        if len(pairs) >= count:
+            break
+        start = (rng.randint(low, high), rng.randint(low, high))
+        angle = rng.uniform(0, 2 * math.pi)
+        distance = rng.uniform(min_distance, max_distance)
+        goal = (int(start[0] + math.cos(angle) * distance), int(start[1] + math.sin(angle) * distance))
+        if not (low <= goal[0] <= high and low <= goal[1] <= high):
+            continue
+        if pathfinder.get_cost(start) == float('inf') or pathfinder.get_cost(goal) == float('inf'):
+            continue
+        crossed = line_biomes(world, start, goal)
+        if crossed_biome == "Water" and "Water" not in crossed:
+            continue
+        if crossed_biome == "Mountains" and ("Mountains" not in crossed or "Water" in crossed):
+            continue
+        pairs.append((start, goal))
+    return pairs
+
+def run_pair(world, start, goal, max_iterations):
+    """Mesure un appel à a_star puis la simplification seule du chemin brut."""
+    pathfinder = Pathfinding(world)
+    with contextlib.redirect_stdout(io.StringIO()):  # a_star affiche ses itérations
+        begin = time.perf_counter()
+        path = pathfinder.a_star(start, goal, float('inf'), max_iterations)
+        a_star_time = time.perf_counter() - begin
+
+    simplify_time = None
+    if pathfinder.last_raw_path:
+        begin = time.perf_counter()
+        Pathfinding(world).simplify_path(list(pathfinder.last_raw_path))
+        simplify_time = time.perf_counter() - begin
+
+    goal_center = (goal[0] + 0.5, goal[1] + 0.5)
+    failed = not path or path[-1] != goal_center
+    length = 0.0
+    previous = start
+    for node in path:
+        length += math.dist(previous, node)
+        previous = node
+    return {
+        "start": list(start),
+        "goal": list(goal),
+        "failed": failed,
+        "expansions": pathfinder.last_iterations,
+        "time_ms": a_star_time * 1000,
+        "simplify_ms": simplify_time * 1000 if simplify_time is not None else None,
+        "path_nodes": len(path),
+        "path_length": length,
+    }
+
+def summarize(runs):
+    """Agrège les mesures d'un scénario."""
+    times = sorted(run["time_ms"] for run in runs)
+    simplify_times = [run["simplify_ms"] for run in runs if run["simplify_ms"] is not None]
+    succeeded = [run for run in runs if not run["failed"]]
+    return {
+        "count": len(runs),
+        "failure_rate": (len(runs) - len(succeeded)) / len(runs) if runs else 0.0,
+        "expansions_mean": statistics.mean(run["expansions"] for run in runs) if runs else 0,
+        "time_ms_mean": statistics.mean(times) if times else 0.0,
+        "time_ms_median": statistics.median(times) if times else 0.0,
+        "time_ms_p95": times[int(0.95 * (len(times) - 1))] if times else 0.0,
+        "simplify_ms_mean": statistics.mean(simplify_times) if simplify_times else 0.0,
+        "path_length_mean": statistics.mean(run["path_length"] for run in succeeded) if succeeded else 0.0,
+    }
+
+def current_commit():
+    """Retourne le commit courant, si le banc est lancé depuis le dépôt git."""
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], stderr=subprocess.DEVNULL, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def compare(results, baseline, threshold):
+    """Affiche les écarts avec une exécution de référence ; retourne False en cas de régression."""
+    ok = True
+    for key, summary in results["summary"].items():
+        reference = baseline["summary"].get(key)
+        if not reference:
+            continue
+        for metric in ("time_ms_median", "expansions_mean", "failure_rate"):
+            old, new = reference[metric], summary[metric]
+            delta = (new - old) / old if old else 0.0
+            regression = metric != "failure_rate" and delta > threshold or metric == "failure_rate" and new > old
+            ok = ok and not regression
+            flag = "  REGRESSION" if regression else ""
+            print(f"{key:40s} {metric:16s} {old:10.3f} -> {new:10.3f} ({delta:+.1%}){flag}")
+    return ok
+
+def main():
+    parser = argparse.ArgumentParser(description="Banc d'essai du pathfinding.")
+    parser.add_argument("--config", default="config.json")
+    parser.add_argument("--seeds", type=int, nargs="*", help="Graines Perlin (par défaut celle de la configuration)")
+    parser.add_argument("--radius", type=int, help="Rayon de chunks générés (par défaut initial_chunk_radius)")
+    parser.add_argument("--pairs", type=int, default=20, help="Nombre de couples par scénario")
+    parser.add_argument("--scenario-seed", type=int, default=0, help="Graine du tirage des couples départ/arrivée")
+    parser.add_argument("--max-iterations", type=int, default=20000)
+    parser.add_argument("--output", help="Fichier JSON où écrire les résultats")
+    parser.add_argument("--compare", help="Fichier JSON de référence à comparer")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Régression relative tolérée")
+    args = parser.parse_args()
+
+    config = load_config(args.config)
+    seeds = args.seeds or [config['perlin']['seed']]
+    radius = args.radius if args.radius is not None else config['initial_chunk_radius']
+    results = {"commit": current_commit(), "radius": radius, "pairs": args.pairs,
+               "scenario_seed": args.scenario_seed, "summary": {}, "runs": {}}
+
+    with tempfile.TemporaryDirectory() as directory:
+        for seed in seeds:
+            world = build_world(config, seed, radius, os.path.join(directory, f"chunks_{seed}.json"))
+            pathfinder = Pathfinding(world)
+            for index, scenario in enumerate(SCENARIOS):
+                rng = random.Random(args.scenario_seed * 1000 + index)
+                pairs = generate_pairs(world, pathfinder, scenario, args.pairs, rng)
+                if not pairs:
+                    print(f"Aucun couple trouvé pour le scénario {scenario} avec la graine {seed}.")
+                runs = [run_pair(world, start, goal, args.max_iterations) for start, goal in pairs]
+                key = f"{seed}/{scenario}"
+                results["runs"][key] = runs
+                results["summary"][key] = summary = summarize(runs)
+                print(f"{key:40s} n={summary['count']:3d} échecs={summary['failure_rate']:.0%} "
+                      f"expansions={summary['expansions_mean']:8.1f} médiane={summary['time_ms_median']:8.2f} ms "
+                      f"p95={summary['time_ms_p95']:8.2f} ms simplification={summary['simplify_ms_mean']:6.3f} ms "
+                      f"longueur={summary['path_length_mean']:6.1f}")
+            world.path_service.shutdown()
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+    if args.compare:
+        with open(args.compare, 'r') as f:
+            baseline = json.load(f)
+        if not compare(results, baseline, args.threshold):
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,184 @@
+"""
+Banc d'essai du rendu de la caméra (Camera.render), hors de toute fenêtre interactive.
+
+Le rendu se fait avec le pilote SDL « dummy » : l'écran de la caméra est une surface hors écran.
+Le banc balaie les niveaux de zoom, le nombre d'entités et les surcouches des PNJ (zone visible,
+chemins, zone découverte), et mesure des images entièrement redessinées (cas d'une caméra qui
+bouge) avec le temps de chaque phase : terrain, items, entities, overlays, hud, ainsi que scene
+(description des éléments à dessiner). Le monde, les entités et leurs ticks de simulation sont
+tirés de graines fixes, de sorte que deux exécutions sur deux commits différents mesurent
+exactement la même charge.
+
+Exemples :
+    python bench_render.py --output bench_render.json
+    python bench_render.py --compare bench_render.json --threshold 0.2
+"""
+import os
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+import argparse, contextlib, io, json, random, statistics, subprocess, sys, tempfile, time
+import pygame
+from moteurGraphique import World, Camera, load_config
+from event import EventManager
+from entity import Animal
+from item import Item, DroppedItem
+from PNJ import PNJ
+
+PHASES = ("terrain", "items", "entities", "overlays", "hud", "scene")
+
+# Nom -> (zone visible, chemins et cibles, contour de la zone découverte)
+OVERLAYS = {
+    "aucune": (False, False, False),
+    "vision": (True, False, False),
+    "chemins": (False, True, False),
+    "decouverte": (False, False, True),
+    "toutes": (True, True, True),
+}
+
+def build_world(config, seed, radius, chunk_file):
+    """Construit un monde déterministe sans toucher au cache de chunks du jeu."""
+    config = dict(config, perlin=dict(config['perlin'], seed=seed), initial_chunk_radius=radius)
+    return World(config, event_manager=EventManager(), chunk_file=chunk_file, seed=seed, deterministic=True)
+
+def populate(world, count, spread, rng):
+    """Ajoute `count` entités (un quart de PNJ, au moins un) sur des tuiles franchissables autour de l'origine."""
+    pnjs = max(1, count // 4)
+    added = 0
+    while added < count:
+        x, y = rng.uniform(-spread, spread), rng.uniform(-spread, spread)
+        tile = world.get_tile_at(int(x), int(y))
+        if not world.biomes.passable[world.biomes.get_id(tile.biome)]:
+            continue
+        world.add_entity(PNJ(x, y, world, size=1.6) if added < pnjs else Animal(f"animal_{added}", x, y, world))
+        added += 1
+
+def scatter_items(world, count, spread, rng):
+    """Dépose `count` objets au sol autour de l'origine."""
+    for index in range(count):
+        x, y = rng.uniform(-spread, spread), rng.uniform(-spread, spread)
+        world.get_chunk_from_position(x, y).add_dropped_item(DroppedItem(Item(f"item_{index % 5}"), (x, y)))
+
+def simulate(world, ticks, delta_time=0.05):
+    """Fait avancer la simulation pour que les PNJ aient des chemins, des cibles et une zone découverte."""
+    with contextlib.redirect_stdout(io.StringIO()):  # Les entités affichent leurs décisions
+        for _ in range(ticks):
+            world.update_entities(delta_time)
+
+def run_case(camera, scale, overlays, frames):
+    """Mesure `frames` images entièrement redessinées ; retourne les durées totales et par phase (ms)."""
+    camera.show_vision, camera.show_paths, camera.show_discovered = overlays
+    camera.scale = scale
+    pnjs = camera.world.entities.get("PNJ", [])
+    camera.camera_center_x = statistics.mean(pnj.x for pnj in pnjs)
+    camera.camera_center_y = statistics.mean(pnj.y for pnj in pnjs)
+
+    # Mise en route : surfaces des chunks à ce zoom, et carte d'ensemble échantillonnée en entier
+    camera.render()
+    while camera.is_overview() and camera.overview_surface[0] is None:
+        camera.render()
+
+    runs = []
+    for _ in range(frames):
+        camera.previous_camera_position = None  # Force une image complète
+        camera.phase_times = {}
+        for index in range(4):
+            camera.draw_text(("bench", index), f"system_{index}: {60 + index} FPS", (camera.screen_width - 200, 10 + 30 * index))
+        begin = time.perf_counter()
+        camera.render()
+        elapsed = time.perf_counter() - begin
+        runs.append(dict({phase: camera.phase_times.get(phase, 0.0) * 1000 for phase in PHASES}, time_ms=elapsed * 1000))
+    camera.phase_times = None
+    return runs
+
+def summarize(runs):
+    """Agrège les mesures d'un cas."""
+    times = sorted(run["time_ms"] for run in runs)
+    summary = {
+        "frames": len(runs),
+        "time_ms_median": statistics.median(times),
+        "time_ms_p95": times[int(0.95 * (len(times) - 1))],
+    }
+    for phase in PHASES:
+        summary[f"{phase}_ms_mean"] = statistics.mean(run[phase] for run in runs)
+    return summary
+
+def current_commit():
+    """Retourne le commit courant, si le banc est lancé depuis le dépôt git."""
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], stderr=subprocess.DEVNULL, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def compare(results, baseline, threshold, min_ms):
+    """Affiche les écarts avec une exécution de référence ; retourne False en cas de régression.
+
+    Les phases dont la durée de référence est inférieure à `min_ms` sont affichées mais pas jugées :
+    à cette échelle, l'écart relatif n'est que du bruit de mesure.
+    """
+    ok = True
+    for key, summary in results["summary"].items():
+        reference = baseline["summary"].get(key)
+        if not reference:
+            continue
+        for metric in ("time_ms_median",) + tuple(f"{phase}_ms_mean" for phase in PHASES):
+            old, new = reference[metric], summary[metric]
+            delta = (new - old) / old if old else 0.0
+            regression = old >= min_ms and delta > threshold
+            ok = ok and not regression
+            flag = "  REGRESSION" if regression else ""
+            print(f"{key:32s} {metric:16s} {old:10.3f} -> {new:10.3f} ({delta:+.1%}){flag}")
+    return ok
+
+def main():
+    parser = argparse.ArgumentParser(description="Banc d'essai du rendu de la caméra, sur une surface hors écran.")
+    parser.add_argument("--config", default="config.json")
+    parser.add_argument("--seed", type=int, help="Graine Perlin (par défaut celle de la configuration)")
+    parser.add_argument("--radius", type=int, default=2, help="Rayon de chunks générés")
+    parser.add_argument("--scales", type=float, nargs="*", default=[1.0, 4.0, 16.0], help="Niveaux de zoom (pixels par tuile)")
+    parser.add_argument("--entities", type=int, nargs="*", default=[4, 32, 128], help="Nombres d'entités")
+    parser.add_argument("--overlays", nargs="*", choices=list(OVERLAYS), help="Surcouches à mesurer (par défaut toutes)")
+    parser.add_argument("--items", type=int, default=40, help="Nombre d'objets déposés au sol")
+    parser.add_argument("--spread", type=float, default=20.0, help="Demi-côté de la zone où entités et objets sont placés")
+    parser.add_argument("--ticks", type=int, default=40, help="Ticks de simulation avant les mesures")
+    parser.add_argument("--frames", type=int, default=20, help="Images mesurées par cas")
+    parser.add_argument("--scenario-seed", type=int, default=0, help="Graine du placement des entités")
+    parser.add_argument("--output", help="Fichier JSON où écrire les résultats")
+    parser.add_argument("--compare", help="Fichier JSON de référence à comparer")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Régression relative tolérée")
+    parser.add_argument("--min-ms", type=float, default=0.1, help="Durée de référence en dessous de laquelle une phase n'est pas jugée")
+    args = parser.parse_args()
+
+    config = load_config(args.config)
+    seed = args.seed if args.seed is not None else config['perlin']['seed']
+    results = {"commit": current_commit(), "seed": seed, "radius": args.radius, "ticks": args.ticks,
+               "frames": args.frames, "scenario_seed": args.scenario_seed, "summary": {}}
+
+    pygame.init()
+    with tempfile.TemporaryDirectory() as directory:
+        for count in args.entities:
+            world = build_world(config, seed, args.radius, os.path.join(directory, f"chunks_{count}.json"))
+            rng = random.Random(args.scenario_seed * 1000 + count)
+            populate(world, count, args.spread, rng)
+            scatter_items(world, args.items, args.spread, rng)
+            simulate(world, args.ticks)
+            camera = Camera(world, world.config)
+            for scale in args.scales:
+                for overlay in args.overlays or OVERLAYS:
+                    key = f"x{scale:g}/{count}/{overlay}"
+                    results["summary"][key] = summary = summarize(run_case(camera, scale, OVERLAYS[overlay], args.frames))
+                    phases = " ".join(f"{phase}={summary[f'{phase}_ms_mean']:6.2f}" for phase in PHASES)
+                    print(f"{key:32s} médiane={summary['time_ms_median']:7.2f} ms p95={summary['time_ms_p95']:7.2f} ms {phases}")
+            world.path_service.shutdown()
+    pygame.quit()
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+    if args.compare:
+        with open(args.compare, 'r') as f:
+            baseline = json.load(f)
+        if not compare(results, baseline, args.threshold, args.min_ms):
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+import numpy as np
+
+UNKNOWN_BIOME = 0  # Identifiant réservé aux tuiles dont le biome est absent de la configuration
+DEFAULT_COLOR = (10, 10, 50)
+DEFAULT_COST = 2
+BIOME_COSTS = {'Water': float('inf'), 'Mountains': 5, 'Beach': 2, 'Plains': 1}  # Coûts de déplacement par défaut
+IMPASSABLE_BIOMES = ('Water', 'Mountains')  # Biomes infranchissables à pied et opaques pour la vision
+
+class BiomeRegistry:
+    """Registre des biomes compilé une seule fois à partir de `config['biomes']`.
+
+    Chaque biome reçoit un petit identifiant entier (0 pour un biome inconnu) ; la couleur, le coût de
+    déplacement et la franchissabilité sont rangés dans des tables indexées par cet identifiant. Une
+    entrée de la configuration peut préciser `cost` et `passable` pour remplacer les valeurs par défaut.
+    """
+    def __init__(self, biomes):
+        self.names = (None,) + tuple(biome['name'] for biome in biomes)
+        self.ids = {name: biome_id for biome_id, name in enumerate(self.names) if name is not None}
+        self.colors = [DEFAULT_COLOR] + [tuple(biome['color']) for biome in biomes]
+        self.costs = np.array([DEFAULT_COST] + [biome.get('cost', BIOME_COSTS.get(biome['name'], DEFAULT_COST))
+                                                for biome in biomes], dtype=float)
+        self.passable = np.array([True] + [biome.get('passable', biome['name'] not in IMPASSABLE_BIOMES)
+                                           for biome in biomes], dtype=bool)
+        self.color_table = np.array(self.colors, dtype=np.uint8)
+
+    def get_id(self, name):
+        """Retourne l'identifiant d'un biome à partir de son nom."""
+        return self.ids.get(name, UNKNOWN_BIOME)
+
+    def get_color(self, name):
+        """Retourne la couleur d'un biome à partir de son nom."""
+        return self.colors[self.ids.get(name, UNKNOWN_BIOME)]
+
+    def get_cost(self, name):
+        """Retourne le coût de déplacement d'un biome à partir de son nom."""
+        return float(self.costs[self.ids.get(name, UNKNOWN_BIOME)])
+
+    def get_chunk_ids(self, chunk):
+        """Retourne la grille (chunk_size x chunk_size) des identifiants de biome du chunk, mise en cache sur celui-ci."""
+        if chunk.biome_ids is None:
+            chunk.biome_ids = np.array([[self.ids.get(tile.biome, UNKNOWN_BIOME) for tile in row] for row in chunk.tiles],
+                                       dtype=np.uint8)
+        return chunk.biome_ids
+
+    def get_tile_id(self, chunk, local_x, local_y):
+        """Retourne l'identifiant du biome d'une tuile du chunk (coordonnées locales)."""
+        return int(self.get_chunk_ids(chunk)[local_x, local_y])
@@ -0,0 +1,60 @@
+"""
+Vérifications de l'ordonnanceur de tâches (task.TaskManager).
+
+Scénario court sur une entité factice : ordre par priorité et par ordre d'ajout, tâche liée qui passe
+avant les autres, changement de priorité et annulation d'une tâche en attente, refus d'une tâche dont
+le coût en énergie dépasse le budget des tâches en attente.
+
+Exemple :
+    python check_tasks.py
+"""
+import contextlib, io, sys, types
+from task import Task, TaskManager
+
+def run(manager, order, ticks=20):
+    """Exécute les tâches, chacune terminée au tick qui suit sa première exécution (inscrite dans `order`)."""
+    with contextlib.redirect_stdout(io.StringIO()):  # Le gestionnaire annonce chaque tâche
+        for _ in range(ticks):
+            manager.execute_tasks(0.1)
+            task = manager.current_task
+            if task and task.name in order:
+                manager.set_task_completed()
+
+def main():
+    entity = types.SimpleNamespace(needs={"energy": 100})
+    manager = TaskManager(entity, energy_budget=10)
+    order = []
+    tasks = {}
+    for name, priority, cost in (("a", 1, 2), ("b", 5, 2), ("c", 5, 2), ("d", 3, 2)):
+        tasks[name] = Task(name, lambda delta_time, name=name: order.append(name), priority, cost)
+    chained = Task("b2", lambda delta_time: order.append("b2"), 0, 1)
+
+    errors = []
+    if not manager.add_task(tasks["a"]) or not manager.create_linked_tasks([tasks["b"], chained]):
+        errors.append("tâches refusées alors que le budget le permet")
+    manager.add_task(tasks["c"])
+    manager.add_task(tasks["d"])  # Coût en attente : 8 sur 10
+    with contextlib.redirect_stdout(io.StringIO()):  # Le refus est annoncé
+        admitted = manager.add_task(Task("e", None, 9, 3))
+    if admitted:
+        errors.append("tâche admise au-delà du budget d'énergie")
+    manager.reprioritize(tasks["a"], 4)  # Passe devant d
+    manager.cancel(tasks["c"])
+    if manager.queued_cost != 6:
+        errors.append(f"coût en attente {manager.queued_cost} au lieu de 6")
+
+    run(manager, order)
+    expected = ["b", "b2", "a", "d"]
+    if list(dict.fromkeys(order)) != expected:
+        errors.append(f"ordre d'exécution {list(dict.fromkeys(order))} au lieu de {expected}")
+    if manager.is_busy() or manager.queued_cost != 0:
+        errors.append("des tâches restent en attente")
+
+    for error in errors:
+        print(error)
+    print("tâches : OK" if not errors else f"tâches : {len(errors)} erreur(s)")
+    if errors:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
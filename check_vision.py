@@ -0,0 +1,63 @@
+"""
+Vérifications de non-régression du lancer de rayons de vision (vision.cast_rays_batch).
+
+Un rayon qui passe exactement par le sommet commun de deux tuiles bloquantes placées en diagonale
+doit s'arrêter à ce sommet : la vue ne doit pas se faufiler entre elles. Le cas se produit dès qu'une
+entité au centre d'une tuile, tournée selon un axe, a un angle de vue de 90° : ses rayons extrêmes
+partent exactement à 45°. Le terrain est une grille de franchissabilité construite à la main.
+
+Exemple :
+    python check_vision.py
+"""
+import math, sys, types
+import numpy as np
+from vision import cast_rays_batch
+
+CHUNK_SIZE = 16
+
+def make_world(blocked):
+    """Monde minimal dont tous les chunks partagent la même grille, avec les tuiles `blocked` infranchissables."""
+    grid = np.ones((CHUNK_SIZE, CHUNK_SIZE), dtype=bool)
+    for x, y in blocked:
+        grid[x % CHUNK_SIZE, y % CHUNK_SIZE] = False
+    chunk = types.SimpleNamespace(passable_grid=grid)
+    return types.SimpleNamespace(config={'chunk_size': CHUNK_SIZE}, biomes=None, get_chunk=lambda chunk_x, chunk_y: chunk)
+
+def check_vertex(direction, x=5.5, y=5.5, vision_range=10):
+    """Bloque, pour chaque rayon extrême à 45°, les deux tuiles qui encadrent le sommet qu'il traverse.
+
+    Retourne la liste des erreurs : rayon qui dépasse son sommet, ou tuile visible derrière lui.
+    """
+    dx, dy = direction
+    tile_x, tile_y = int(math.floor(x)), int(math.floor(y))
+    corners = []
+    for side in (-1, 1):
+        # Rayon extrême : direction tournée de ±45°, soit la somme de l'axe et de sa perpendiculaire
+        step_x, step_y = dx - side * dy, dy + side * dx
+        corners.append(((step_x, step_y), [(tile_x + step_x, tile_y), (tile_x, tile_y + step_y)], (tile_x + step_x, tile_y + step_y)))
+    world = make_world([tile for _, sides, _ in corners for tile in sides])
+    entity = types.SimpleNamespace(x=x, y=y, direction=direction, vision_range=vision_range, view_angle=90)
+    visible_tiles, hit_points = cast_rays_batch(world, [entity])[0]
+    visible = {tuple(tile) for tile in visible_tiles.tolist()}
+
+    errors = []
+    for (_, _, beyond), hit in zip(corners, (hit_points[0], hit_points[-1])):
+        distance = math.hypot(hit[0] - x, hit[1] - y)
+        if distance > math.sqrt(0.5) + 1e-9:
+            errors.append(f"direction {direction} : le rayon passe le sommet et s'arrête en {hit}")
+        if beyond in visible:
+            errors.append(f"direction {direction} : la tuile {beyond} est visible entre deux tuiles bloquantes")
+    return errors
+
+def main():
+    errors = []
+    for direction in ((0, -1), (0, 1), (1, 0), (-1, 0)):
+        errors += check_vertex(direction)
+    for error in errors:
+        print(error)
+    print("vision : OK" if not errors else f"vision : {len(errors)} erreur(s)")
+    if errors:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
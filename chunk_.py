@@ -1,5 +1,6 @@
 import json
 import numpy as np
+from meshing import greedy_mesh_grid
 
 # Charger la configuration depuis un fichier JSON
 def load_config(file_path):
@@ -7,6 +8,30 @@ def load_config(file_path):
         config = json.load(f)
     return config
 
+def interpolate_biomes(biome1, biome2, mix_factor):
+    """Mélange deux biomes en fonction du facteur de mixage."""
+    return biome1 if mix_factor < 0.5 else biome2
+
+def biome_from_noise(biomes, transition_zone, value):
+    """Retourne le biome correspondant à une valeur de bruit, avec des transitions douces entre biomes.
+
+    Partagé par la génération des chunks et par la carte d'ensemble (overview.py), qui échantillonne
+    le bruit sans créer de chunk.
+    """
+    for i, biome in enumerate(biomes):
+        if biome['min_noise_value'] <= value < biome['max_noise_value']:
+            # Transition avec les biomes voisins
+            if i > 0 and value < biome['min_noise_value'] + transition_zone:
+                prev_biome = biomes[i - 1]
+                mix_factor = (value - biome['min_noise_value']) / transition_zone
+                return interpolate_biomes(prev_biome['name'], biome['name'], mix_factor)
+            elif i < len(biomes) - 1 and value > biome['max_noise_value'] - transition_zone:
+                next_biome = biomes[i + 1]
+                mix_factor = (biome['max_noise_value'] - value) / transition_zone
+                return interpolate_biomes(biome['name'], next_biome['name'], mix_factor)
+            return biome['name']
+    return 'Unknown'
+
 class Tile:
     """Représente une tuile individuelle avec des propriétés dynamiques."""
     def __init__(self, x, y, biome, config, **kwargs):
@@ -52,7 +77,7 @@ class Tile:
 
 class Chunk:
     """Classe représentant un chunk de terrain."""
-    def __init__(self, x,y, noise_generator, config, chunk_lock=None, entity_lock=None, loaded=False):
+    def __init__(self, x,y, noise_generator, config, chunk_lock=None, entity_lock=None, loaded=False, registry=None):
         self.x_offset, self.y_offset = x * config['chunk_size'], y * config['chunk_size']
         self.x, self.y = x,y
         self.chunk_size = config['chunk_size']
@@ -64,15 +89,26 @@ class Chunk:
         self.entity_lock = entity_lock
         self.tiles = None
         self.mesh_cache = None
+        self.cost_grid = None  # Coûts de déplacement des tuiles, calculés par Pathfinding
+        self.passable_grid = None  # Franchissabilité des tuiles pour la vision
+        self.biome_ids = None  # Identifiants de biome des tuiles, calculés par le BiomeRegistry
+        self.resource_summary = None  # Tuiles de bordure de chaque îlot de biome
         
         self.dropped_items = []
         
         if not loaded:
-            self.tiles = self.generate_chunk(noise_generator, config)
+            self.tiles = self.generate_chunk(noise_generator, config, registry)
+            if registry is not None:
+                # Maillage calculé dès la génération, dans le thread qui crée le chunk
+                self.calculate_mesh(registry)
     
-    def generate_chunk(self, noise_generator, config):
-        """Génère un chunk avec des tuiles détaillées et des statistiques de biomes."""
+    def generate_chunk(self, noise_generator, config, registry=None):
+        """Génère un chunk avec des tuiles détaillées et des statistiques de biomes.
+
+        Avec le registre des biomes, la grille des identifiants de biome est remplie au passage.
+        """
         chunk = np.zeros((self.chunk_size, self.chunk_size), dtype=object)
+        biome_ids = np.zeros((self.chunk_size, self.chunk_size), dtype=np.uint8)
         
         for x in range(self.chunk_size):
             for y in range(self.chunk_size):
@@ -84,24 +120,16 @@ class Chunk:
                 self.update_biome_info(biome, x + self.x_offset, y + self.y_offset)
                 # Créer une tuile avec les données initiales
                 chunk[x][y] = Tile(x + self.x_offset, y + self.y_offset, biome, config, chunk_lock=self.chunk_lock, entity_lock=self.entity_lock)
+                if registry is not None:
+                    biome_ids[x, y] = registry.get_id(biome)
         
+        if registry is not None:
+            self.biome_ids = biome_ids
         return chunk
     
     def get_biome_with_transition(self, value):
         """Retourne un biome avec des transitions douces entre biomes."""
-        for i, biome in enumerate(self.biomes):
-            if biome['min_noise_value'] <= value < biome['max_noise_value']:
-                # Transition avec les biomes voisins
-                if i > 0 and value < biome['min_noise_value'] + self.transition_zone:
-                    prev_biome = self.biomes[i - 1]
-                    mix_factor = (value - biome['min_noise_value']) / self.transition_zone
-                    return self.interpolate_biomes(prev_biome['name'], biome['name'], mix_factor)
-                elif i < len(self.biomes) - 1 and value > biome['max_noise_value'] - self.transition_zone:
-                    next_biome = self.biomes[i + 1]
-                    mix_factor = (biome['max_noise_value'] - value) / self.transition_zone
-                    return self.interpolate_biomes(biome['name'], next_biome['name'], mix_factor)
-                return biome['name']
-        return 'Unknown'
+        return biome_from_noise(self.biomes, self.transition_zone, value)
 
     def update_biome_info(self, biome_name, x=None, y=None):
         """Met à jour les infos sur les biomes regroupe les ilots de même type dans le chunk."""
@@ -112,6 +140,25 @@ class Chunk:
             self.biome_info[biome_name] = set()
             self.biome_info[biome_name].add((x, y))
             
+    def get_resource_summary(self):
+        """Retourne, pour chaque biome, les tuiles de bordure de ses îlots (partagé entre les PNJ).
+        
+        La tuile d'un îlot la plus proche d'un point extérieur est toujours sur sa bordure :
+        il suffit donc de conserver ces tuiles pour les recherches de ressource la plus proche.
+        """
+        if self.resource_summary is None:
+            summary = {}
+            for biome_name, tiles in self.biome_info.items():
+                summary[biome_name] = tuple(
+                    (x, y) for x, y in tiles
+                    if not (self.is_inside_chunk(x + 1, y) and (x + 1, y) in tiles and
+                            self.is_inside_chunk(x - 1, y) and (x - 1, y) in tiles and
+                            self.is_inside_chunk(x, y + 1) and (x, y + 1) in tiles and
+                            self.is_inside_chunk(x, y - 1) and (x, y - 1) in tiles)
+                )
+            self.resource_summary = summary
+        return self.resource_summary
+
     def is_adjacent_to_same_biome(self, x, y, biome_name):
         """Vérifie si une tuile est adjacente à une tuile du même type de biome."""
         directions = [(1, 0), (-1, 0), (0, 1), (0, -1)]
@@ -145,7 +192,7 @@ class Chunk:
     
     def interpolate_biomes(self, biome1, biome2, mix_factor):
         """Mélange deux biomes en fonction du facteur de mixage."""
-        return biome1 if mix_factor < 0.5 else biome2
+        return interpolate_biomes(biome1, biome2, mix_factor)
     
     def add_dropped_item(self, dropped_item):
         self.dropped_items.append(dropped_item)
@@ -161,15 +208,31 @@ class Chunk:
                     return dropped_item
         return None
     
-    def calculate_mesh(self, greedy_mesh):
+    def calculate_mesh(self, biomes):
+        """Retourne les rectangles (x, y, largeur, hauteur, identifiant de biome) du chunk, calculés sur la grille des biomes."""
         if self.mesh_cache is not None:
             return self.mesh_cache
-        self.mesh_cache = greedy_mesh(self.tiles)
+        self.mesh_cache = greedy_mesh_grid(biomes.get_chunk_ids(self))
         return self.mesh_cache
 
-    def update_tile(self, x, y, new_tile):
-        self.tiles[(x, y)] = new_tile
-        self.mesh_cache = None  # Invalidate cache
+    def update_tile(self, x, y, new_tile, biomes=None):
+        """Remplace une tuile (coordonnées locales) et met à jour les grilles qui en dépendent.
+
+        Avec le registre des biomes, la grille d'identifiants est corrigée sur la seule tuile modifiée
+        (nouvelle grille, pour invalider les caches qui la comparent) et le chunk est remaillé aussitôt.
+        """
+        self.tiles[x][y] = new_tile
+        self.cost_grid = None
+        self.passable_grid = None
+        self.resource_summary = None
+        if biomes is not None and self.biome_ids is not None:
+            biome_ids = self.biome_ids.copy()
+            biome_ids[x, y] = biomes.get_id(new_tile.biome)
+            self.biome_ids = biome_ids
+            self.mesh_cache = greedy_mesh_grid(biome_ids)
+        else:
+            self.biome_ids = None
+            self.mesh_cache = None  # Invalidate cache
     
     def to_dict(self):
         """Convertit le chunk en un dictionnaire sérialisable."""
@@ -181,10 +244,12 @@ class Chunk:
         }
 
     @classmethod
-    def from_dict(cls, data, noise_generator, config, chunk_lock=None, entity_lock=None):
+    def from_dict(cls, data, noise_generator, config, chunk_lock=None, entity_lock=None, registry=None):
         """Crée un chunk à partir d'un dictionnaire sérialisé."""
         chunk = cls(data['x'], data['y'], noise_generator, config, chunk_lock, entity_lock, True)
         chunk.tiles = [[Tile.from_dict(tile_data, config) for tile_data in row] for row in data['tiles']]
+        if registry is not None:
+            chunk.calculate_mesh(registry)
         chunk.biome_info = {k: set(tuple(v) for v in values) for k, values in data['biomes'].items()}
         return chunk
 
@@ -1,9 +1,37 @@
-import random, pygame, math, heapq
+import pygame, math, heapq
 from item import Inventory, DroppedItem
+from vision import get_passable_grid
 from shapely.geometry import Polygon
 
+def make_red_filter(size_in_pixels):
+    """Crée le filtre rouge semi-transparent des entités attaquées."""
+    red_filter = pygame.Surface((size_in_pixels, size_in_pixels), pygame.SRCALPHA)
+    red_filter.fill((255, 0, 0, 175))  # 49% de transparence
+    return red_filter
+
+def draw_entity(screen, color, size_in_pixels, screen_x, screen_y, shape='circle', is_attacked=False, red_filter=None):
+    """Dessine une entité (forme, couleur et filtre rouge si elle a été attaquée) ; partagé avec le rendu par instantanés.
+
+    Le filtre rouge peut être fourni par l'appelant qui le met en cache ; sinon il est créé à la volée.
+    """
+    # Dessiner l'entité en fonction de la forme spécifiée
+    if shape == 'circle':
+        pygame.draw.circle(screen, color, (screen_x, screen_y), size_in_pixels // 2)
+    elif shape == 'square':
+        pygame.draw.rect(screen, color, (screen_x - size_in_pixels // 2, screen_y - size_in_pixels // 2, size_in_pixels, size_in_pixels))
+    # Ajouter d'autres formes si nécessaire
+    else:
+        raise ValueError(f"Forme non supportée: {shape}")
+    
+    # Appliquer le filtre rouge si l'entité a été attaquée
+    if is_attacked:
+        if red_filter is None:
+            red_filter = make_red_filter(size_in_pixels)
+        screen.blit(red_filter, (screen_x - size_in_pixels // 2, screen_y - size_in_pixels // 2))
+
 class Entity:
     """Classe représentant une entité générique dans le monde."""
+    shape = 'circle'  # Forme dessinée par le rendu
     def __init__(self, x, y, world, size=1.0, entity_type="generic", storage_capacity = 10, resources = []):
         self.id = world.generate_id()  # Identifiant unique de l'entité
         self.x = x
@@ -102,10 +130,13 @@ class Entity:
         print(f"{self.name} est mort.")
 
     def register_for_events(self):
-        self.event_manager.register_listener("interaction", self.on_event)
-        self.event_manager.register_listener("collision", self.on_event)
-        self.event_manager.register_listener("attack", self.on_event)
-        self.event_manager.register_listener("death", self.on_event)
+        """Abonne l'entité aux événements qui lui sont adressés."""
+        for event_type in ("interaction", "collision", "attack", "death"):
+            self.event_manager.register_target_listener(self.id, event_type, self.on_event)
+
+    def unregister_from_events(self):
+        """Désabonne l'entité de tous ses événements (mort ou retrait du monde)."""
+        self.event_manager.unregister_entity(self.id)
     
     def apply_gravity(self, delta_time):
         """Applique la gravité si l'entité n'est pas au sol."""
@@ -180,25 +211,11 @@ class Entity:
                     self.vx -= dx / distance * avoidance_factor
                     self.vy -= dy / distance * avoidance_factor
 
-    def render(self, screen, scale, screen_x, screen_y, shape='circle'):
+    def render(self, screen, scale, screen_x, screen_y, shape=None):
         """Affiche graphiquement l'entité sur l'écran avec des options de personnalisation."""
         # Convertir la position en pixels en fonction de l'échelle
         size_in_pixels = int(self.size * scale)
-
-        # Dessiner l'entité en fonction de la forme spécifiée
-        if shape == 'circle':
-            pygame.draw.circle(screen, self.color, (screen_x, screen_y), size_in_pixels // 2)
-        elif shape == 'square':
-            pygame.draw.rect(screen, self.color, (screen_x - size_in_pixels // 2, screen_y - size_in_pixels // 2, size_in_pixels, size_in_pixels))
-        # Ajouter d'autres formes si nécessaire
-        else:
-            raise ValueError(f"Forme non supportée: {shape}")
-        
-        # Appliquer le filtre rouge si l'entité a été attaquée
-        if self.is_attacked:
-            red_filter = pygame.Surface((size_in_pixels, size_in_pixels), pygame.SRCALPHA)
-            red_filter.fill((255, 0, 0, 175))  # 49% de transparence
-            screen.blit(red_filter, (screen_x - size_in_pixels // 2, screen_y - size_in_pixels // 2))
+        draw_entity(screen, self.color, size_in_pixels, screen_x, screen_y, shape or self.shape, self.is_attacked)
 
     def update(self, delta_time):
         """ Met à jour l'entité en fonction du temps écoulé."""
@@ -231,6 +248,7 @@ class Entity:
         return f"{self.name}: Storage - {self.storage_inventory}, Resources - {self.resource_inventory}, Holding - {self.holding_item}"
 
 class Animal(Entity):
+    shape = 'square'
     def __init__(self, name, x, y, world, energy=100, hunger=100, thirst=100):
         super().__init__(x, y, world, entity_type="animal")
         self.name = name
@@ -238,7 +256,7 @@ class Animal(Entity):
         self.is_alive = True
         self.speed = 0.6  # Vitesse de déplacement de base
         self.intelligence = 0.5  # Niveau d'intelligence de l'animal (peut influencer ses décisions)
-        self.direction = (random.uniform(-1, 1), random.uniform(-1, 1))
+        self.direction = (world.rng.uniform(-1, 1), world.rng.uniform(-1, 1))
         self.normalize_direction()
         
         # Ajoute les items de base à l'inventaire des ressources
@@ -247,7 +265,7 @@ class Animal(Entity):
 
     def wander(self, delta_time):
         """Déplacement aléatoire pour les animaux avec des mouvements plus réalistes."""
-        change = (random.uniform(-0.1, 0.1), random.uniform(-0.1, 0.1))
+        change = (self.world.rng.uniform(-0.1, 0.1), self.world.rng.uniform(-0.1, 0.1))
         self.direction = (self.direction[0] + change[0], self.direction[1] + change[1])
         self.normalize_direction()
         
@@ -255,8 +273,8 @@ class Animal(Entity):
         next_x = self.x + self.direction[0] * self.speed * delta_time
         next_y = self.y + self.direction[1] * self.speed * delta_time
         
-        # Vérifier si la prochaine position est de l'eau
-        if self.is_water(next_x, next_y):
+        # Vérifier si la prochaine position est infranchissable (eau ou montagnes)
+        if self.is_impassable(next_x, next_y):
             # Inverser la direction
             self.direction = (-self.direction[0], -self.direction[1])
             self.normalize_direction()
@@ -266,16 +284,15 @@ class Animal(Entity):
         self.vy = float(self.vy)
         super().move(delta_time)
 
-    def is_water(self, x, y):
-        """Vérifie si la tuile à la position (x, y) est de l'eau."""
+    def is_impassable(self, x, y):
+        """Vérifie si la tuile à la position (x, y) est infranchissable (eau ou montagnes)."""
         chunk_x = int(x // self.config['chunk_size'])
         chunk_y = int(y // self.config['chunk_size'])
         chunk = self.world.get_chunk(chunk_x, chunk_y)
         local_x = int(x % self.config['chunk_size'])
         local_y = int(y % self.config['chunk_size'])
         if 0 <= local_x < self.config['chunk_size'] and 0 <= local_y < self.config['chunk_size']:
-            tile = chunk.tiles[local_x][local_y]
-            return tile.biome in ['Water', "Mountain"]
+            return not get_passable_grid(self.world.biomes, chunk)[local_x, local_y]
         return False
         
     def move(self):
@@ -311,6 +328,7 @@ class Animal(Entity):
         self.is_alive = False
         # Logique pour enlever l'animal du monde
         print(f"{self.name} est mort.")
+        self.unregister_from_events()
         
         # Dropper les ressources de l'animal
         self.drop_all_items(self.world.get_chunk(int(self.x // self.config['chunk_size']), int(self.y // self.config['chunk_size'])))
@@ -326,6 +344,21 @@ class Animal(Entity):
         elif distance < 2:
             self.attack(pnj)  # L'animal attaque s'il est carnivore et que le PNJ est trop proche
     
+    def register_for_events(self):
+        """Abonne l'animal à ses événements et aux attaques survenant à proximité."""
+        super().register_for_events()
+        self.event_manager.register_proximity_listener(self, "attack", self.on_nearby_event)
+
+    def on_nearby_event(self, event):
+        """Une attaque proche fait fuir l'animal : sa direction d'errance s'éloigne de l'événement."""
+        if not self.is_alive:
+            return
+        dx = self.x - event.position[0]
+        dy = self.y - event.position[1]
+        if dx or dy:
+            self.direction = (dx, dy)
+            self.normalize_direction()
+
     def run_away_from(self, entity):
         """L'animal fuit de l'entité spécifiée."""
         dx = self.x - entity.x
@@ -345,8 +378,8 @@ class Animal(Entity):
         self.path = [(self.x, self.y)]
         for _ in range(num_points):
             last_x, last_y = self.path[-1]
-            new_x = last_x + random.uniform(-max_distance, max_distance)
-            new_y = last_y + random.uniform(-max_distance, max_distance)
+            new_x = last_x + self.world.rng.uniform(-max_distance, max_distance)
+            new_y = last_y + self.world.rng.uniform(-max_distance, max_distance)
             self.path.append((new_x, new_y))
         self.current_target_index = 0
 
@@ -377,7 +410,7 @@ class Animal(Entity):
         
     def render(self, screen, scale, screen_x, screen_y):
         if self.is_alive:
-            return super().render(screen, scale, screen_x, screen_y, shape='square')
+            return super().render(screen, scale, screen_x, screen_y)
     
     def __str__(self) -> str:
         return super().__str__() + f" Animal {self.name}"
@@ -410,8 +443,15 @@ class Food(Entity):
 
 class Pathfinding:
     """Classe pour gérer le pathfinding avec l'algorithme A*."""
-    def __init__(self, world):
+    def __init__(self, world, visibility_cache=None, max_cached_segments=20000):
         self.world = world
+        self.chunk_size = world.config['chunk_size']
+        self.biomes = world.biomes
+        # Visibilité des segments déjà testés, conservée entre deux recalculs de chemin
+        self.visibility_cache = visibility_cache if visibility_cache is not None else {}
+        self.max_cached_segments = max_cached_segments
+        self.last_iterations = 0
+        self.last_raw_path = None
 
     def heuristic(self, start, goal):
         """Heuristique de la distance de Manhattan (ou Euclidienne) entre deux points."""
@@ -426,17 +466,22 @@ class Pathfinding:
 
     def get_cost(self, node):
         """Retourne le coût de déplacement pour une case donnée (en fonction du type de terrain)."""
-        tile_type = self.world.get_tile_at(node[0], node[1]).biome
-        
-        if tile_type == 'Water':
-            return float('inf')  # Infranchissable sans bateau
-        elif tile_type == 'Mountains':
-            return 5  # Coût élevé
-        elif tile_type == 'Beach':
-            return 2
-        elif tile_type == 'Plains':
-            return 1  # Terrain facile
-        return 2  # Coût par défaut
+        x, y = int(node[0]), int(node[1])
+        chunk = self.world.get_chunk(x // self.chunk_size, y // self.chunk_size)
+        if chunk is None:
+            return float('inf')  # Chunk absent de l'instantané du terrain
+        cost_grid = chunk.cost_grid if chunk.cost_grid is not None else self.build_cost_grid(chunk)
+        return cost_grid[x % self.chunk_size][y % self.chunk_size]
+
+    def build_cost_grid(self, chunk):
+        """Calcule et met en cache sur le chunk la grille des coûts de ses tuiles."""
+        # Listes Python plutôt que tableau NumPy : l'accès élément par élément y est plus rapide dans A*
+        chunk.cost_grid = self.biomes.costs[self.biomes.get_chunk_ids(chunk)].tolist()
+        return chunk.cost_grid
+
+    def biome_cost(self, tile_type):
+        """Retourne le coût de déplacement associé à un biome (infini pour l'eau, sans bateau)."""
+        return self.biomes.get_cost(tile_type)
 
     def a_star(self, start, goal, vision_range, max_iterations=2500, *args):
         """Implémente l'algorithme A* pour trouver le chemin optimal entre start et goal."""
@@ -446,6 +491,7 @@ class Pathfinding:
         g_score = {start: 0}
         f_score = {start: self.heuristic(start, goal)}
         callback_set_path = args[0] if args else None
+        self.last_raw_path = None
         path_found = False  # Variable de contrôle pour indiquer que le chemin a été trouvé
         iterations = 0  # Compteur d'itérations
 
@@ -454,7 +500,8 @@ class Pathfinding:
             _, current = heapq.heappop(open_set)
             if current == goal:
                 print(f"Chemin trouvé après {iterations} itérations.")
-                path = self.simplify_path(self.reconstruct_path(came_from, current))
+                self.last_raw_path = self.reconstruct_path(came_from, current)
+                path = self.simplify_path(list(self.last_raw_path))
                 if path[0] == start:
                     path.pop(0)  # Enlève le point de départ
                 if callback_set_path:
@@ -464,7 +511,8 @@ class Pathfinding:
 
             # Vérifier si la distance entre le nœud actuel et le point de départ dépasse la portée de vision
             if self.heuristic(start, current) > vision_range:
-                path = self.simplify_path(self.reconstruct_path(came_from, current))
+                self.last_raw_path = self.reconstruct_path(came_from, current)
+                path = self.simplify_path(list(self.last_raw_path))
                 if path[0] == start:
                     path.pop(0)  # Enlève le point de départ
                 if callback_set_path:
@@ -480,6 +528,7 @@ class Pathfinding:
                     f_score[neighbor] = tentative_g_score + self.heuristic(neighbor, goal)
                     heapq.heappush(open_set, (f_score[neighbor], neighbor))
         
+        self.last_iterations = iterations  # Nombre de nœuds développés, pour les mesures
         if iterations >= max_iterations:
             print("Limite d'itérations atteinte. A* n'a pas pu trouver de chemin.")
         
@@ -498,6 +547,10 @@ class Pathfinding:
 
     def is_line_passable(self, start, end):
         """Vérifie si un segment de ligne droite entre deux points est franchissable."""
+        return self.find_line_obstacle(start, end) is None
+
+    def find_line_obstacle(self, start, end):
+        """Retourne le premier point infranchissable du segment entre deux points, ou None s'il est franchissable."""
         x1, y1 = start
         x2, y2 = end
         dx = abs(x2 - x1)
@@ -508,7 +561,7 @@ class Pathfinding:
 
         while (x1, y1) != (x2, y2):
             if self.get_cost((x1, y1)) == float('inf'):
-                return False
+                return (x1, y1)
             e2 = err * 2
             if e2 > -dy:
                 err -= dy
@@ -517,18 +570,49 @@ class Pathfinding:
                 err += dx
                 y1 += sy
 
-        return True
+        return None
+
+    def is_segment_visible(self, start, end):
+        """Version mémorisée de is_line_passable.
+
+        Les points d'un chemin sont décalés de leur départ par pas entiers : le segment traverse les mêmes
+        tuiles quelle que soit la position dans la tuile, d'où une clé en coordonnées de tuiles. Un segment
+        bloqué par un chunk absent de l'instantané n'est pas mémorisé, le chunk pouvant être chargé ensuite.
+        """
+        key = (int(start[0]), int(start[1]), int(end[0]), int(end[1]))
+        visible = self.visibility_cache.get(key)
+        if visible is None:
+            if len(self.visibility_cache) >= self.max_cached_segments:
+                self.visibility_cache.clear()
+            obstacle = self.find_line_obstacle(start, end)
+            visible = obstacle is None
+            if visible or self.world.get_chunk(int(obstacle[0]) // self.chunk_size, int(obstacle[1]) // self.chunk_size) is not None:
+                self.visibility_cache[key] = visible
+        return visible
+
+    def get_corners(self, path):
+        """Retourne les nœuds du chemin où la direction change (plus les extrémités)."""
+        corners = [path[0]]
+        for i in range(1, len(path) - 1):
+            previous, current, following = path[i - 1], path[i], path[i + 1]
+            if (current[0] - previous[0], current[1] - previous[1]) != (following[0] - current[0], following[1] - current[1]):
+                corners.append(current)
+        corners.append(path[-1])
+        return corners
 
     def simplify_path(self, path):
         """Simplifie le chemin en supprimant les points intermédiaires inutiles."""
         if not path:
             return path
 
-        simplified_path = [path[0]]
-        for i in range(2, len(path)):
-            if not self.is_line_passable(simplified_path[-1], path[i]):
-                simplified_path.append(path[i - 1])
-        simplified_path.append(path[-1])
+        # Les portions rectilignes sont déjà visibles : seuls les coins sont testés,
+        # avec un test de visibilité par coin (tirage de ficelle)
+        corners = self.get_corners(path) if len(path) > 2 else path
+        simplified_path = [corners[0]]
+        for i in range(2, len(corners)):
+            if not self.is_segment_visible(simplified_path[-1], corners[i]):
+                simplified_path.append(corners[i - 1])
+        simplified_path.append(corners[-1])
         
         # Modifie l'arrivée pour atterir au milieu de la case finale
         if len(simplified_path) > 1:
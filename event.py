@@ -1,38 +1,147 @@
+import threading, math
+
 class Event:
-    def __init__(self, event_type, source, target=None, data=None):
+    def __init__(self, event_type, source, target=None, data=None, radius=None, position=None):
         self.type = event_type  # Le type d'événement, ex: "collision", "interaction"
         self.source = source    # L'entité ou l'objet qui déclenche l'événement
         self.target = target    # L'entité ou l'objet cible de l'événement, si applicable
         self.data = data        # Données supplémentaires, si nécessaire
+        self.radius = radius    # Si précisé, l'événement est aussi livré aux entités à proximité
+        if position is None and hasattr(source, "x") and hasattr(source, "y"):
+            position = (source.x, source.y)
+        self.position = position  # Position de l'événement dans le monde, si applicable
+
+class SpatialGrid:
+    """Index spatial par cellules carrées des entités abonnées aux événements de proximité."""
+    def __init__(self, cell_size=16):
+        self.cell_size = cell_size
+        self.cells = {}  # (cellule x, cellule y) -> liste de (identifiant, x, y)
+
+    def rebuild(self, entities):
+        """Reconstruit l'index à partir des positions actuelles des entités."""
+        cells = {}
+        for entity_id, entity in entities.items():
+            cell = (int(entity.x // self.cell_size), int(entity.y // self.cell_size))
+            cells.setdefault(cell, []).append((entity_id, entity.x, entity.y))
+        self.cells = cells
+
+    def query(self, x, y, radius):
+        """Retourne les identifiants des entités situées à moins de `radius` de (x, y)."""
+        found = []
+        min_x, max_x = int((x - radius) // self.cell_size), int((x + radius) // self.cell_size)
+        min_y, max_y = int((y - radius) // self.cell_size), int((y + radius) // self.cell_size)
+        for cell_x in range(min_x, max_x + 1):
+            for cell_y in range(min_y, max_y + 1):
+                for entity_id, entity_x, entity_y in self.cells.get((cell_x, cell_y), ()):
+                    if math.hypot(entity_x - x, entity_y - y) <= radius:
+                        found.append(entity_id)
+        return found
 
 class EventManager:
-    def __init__(self):
-        self.listeners = {}  # Dictionnaire des écouteurs par type d'événement
+    def __init__(self, cell_size=16):
+        self.listeners = {}  # Type d'événement -> type d'entité ciblée (None = tous) -> listeners
+        self.targeted = {}  # Identifiant d'entité -> type d'événement -> listeners de cette entité
+        self.nearby = {}  # Identifiant d'entité -> (entité, type d'événement -> listeners de proximité)
+        self.grid = SpatialGrid(cell_size)  # Positions des entités de `nearby`, mises à jour à chaque distribution
+        self.pending = []  # Événements émis depuis la dernière distribution
+        self.lock = threading.Lock()  # Protège uniquement la file : l'émission ne prend pas entity_lock
+
+    def register_listener(self, event_type, listener, entity_type=None):
+        """Ajoute un listener pour un type d'événement spécifique.
+
+        Si `entity_type` est précisé, le listener ne reçoit que les événements dont la cible est de ce type.
+        """
+        self.listeners.setdefault(event_type, {}).setdefault(entity_type, []).append(listener)
+
+    def register_target_listener(self, entity_id, event_type, listener):
+        """Ajoute un listener qui ne reçoit que les événements adressés à l'entité `entity_id`."""
+        self.targeted.setdefault(entity_id, {}).setdefault(event_type, []).append(listener)
+
+    def register_proximity_listener(self, entity, event_type, listener):
+        """Ajoute un listener appelé pour les événements localisés émis à proximité de l'entité."""
+        _, listeners = self.nearby.setdefault(entity.id, (entity, {}))
+        listeners.setdefault(event_type, []).append(listener)
+
+    def unregister_listener(self, event_type, listener, entity_type=None):
+        """Retire un listener de diffusion."""
+        listeners = self.listeners.get(event_type, {}).get(entity_type, [])
+        if listener in listeners:
+            listeners.remove(listener)
 
-    def register_listener(self, event_type, listener):
-        """Ajoute un listener pour un type d'événement spécifique."""
-        if event_type not in self.listeners:
-            self.listeners[event_type] = []
-        self.listeners[event_type].append(listener)
+    def unregister_entity(self, entity_id):
+        """Retire tous les listeners adressés à une entité (mort ou retrait du monde)."""
+        self.targeted.pop(entity_id, None)
+        self.nearby.pop(entity_id, None)
 
     def emit_event(self, event):
-        """Envoie un événement à tous les listeners inscrits pour ce type d'événement."""
-        if event.type in self.listeners:
-            for listener in self.listeners[event.type]:
+        """Met l'événement en file ; il sera livré lors de la prochaine distribution (voir dispatch_events).
+
+        Peut être appelé depuis n'importe quel thread.
+        """
+        with self.lock:
+            self.pending.append(event)
+
+    def dispatch_events(self):
+        """Livre, groupés par type, les événements émis depuis la distribution précédente.
+
+        Appelée une fois par tick par le monde. Les événements émis pendant la distribution sont livrés
+        à la distribution suivante.
+        """
+        with self.lock:
+            events, self.pending = self.pending, []
+        if not events:
+            return 0
+        if self.nearby:
+            self.grid.rebuild({entity_id: entity for entity_id, (entity, _) in list(self.nearby.items())})
+        groups = {}
+        for event in events:
+            groups.setdefault(event.type, []).append(event)
+        for group in groups.values():
+            for event in group:
+                self.deliver(event)
+        return len(events)
+
+    def deliver(self, event):
+        """Envoie immédiatement un événement à sa cible puis aux listeners de diffusion concernés par son type.
+
+        Le coût est proportionnel au nombre de destinataires réels, et non au nombre d'entités du monde.
+        """
+        target_id = getattr(event.target, "id", None)
+        if target_id is not None and target_id in self.targeted:
+            # Copie : un listener peut désinscrire l'entité pendant la livraison (ex : mort)
+            for listener in list(self.targeted[target_id].get(event.type, ())):
+                listener(event)
+
+        by_entity_type = self.listeners.get(event.type)
+        if by_entity_type:
+            for listener in list(by_entity_type.get(None, ())):
                 listener(event)
+            target_type = getattr(event.target, "entity_type", None)
+            if target_type is not None:
+                for listener in list(by_entity_type.get(target_type, ())):
+                    listener(event)
+
+        # Événement localisé : entités à moins de `radius`, hors source et cible déjà prévenues
+        if event.radius is not None and event.position is not None and self.nearby:
+            source_id = getattr(event.source, "id", None)
+            for entity_id in self.grid.query(event.position[0], event.position[1], event.radius):
+                if entity_id in (source_id, target_id) or entity_id not in self.nearby:
+                    continue
+                for listener in list(self.nearby[entity_id][1].get(event.type, ())):
+                    listener(event)
 
 class InteractionEvent(Event):
-    def __init__(self, source, target, data=None):
-        super().__init__("interaction", source, target, data)
+    def __init__(self, source, target, data=None, radius=None):
+        super().__init__("interaction", source, target, data, radius)
 
 class CollisionEvent(Event):
-    def __init__(self, source, target, impact_force=None):
-        super().__init__("collision", source, target, {"impact_force": impact_force})
+    def __init__(self, source, target, impact_force=None, radius=None):
+        super().__init__("collision", source, target, {"impact_force": impact_force}, radius)
 
 class AttackEvent(Event):
-    def __init__(self, source, target, damage):
-        super().__init__("attack", source, target, {"damage": damage})
+    def __init__(self, source, target, damage, radius=None):
+        super().__init__("attack", source, target, {"damage": damage}, radius)
 
 class DeathEvent(Event):
-    def __init__(self, source, target):
-        super().__init__("death", source, target)
\ No newline at end of file
+    def __init__(self, source, target, radius=None):
+        super().__init__("death", source, target, radius=radius)
\ No newline at end of file
@@ -0,0 +1,136 @@
+import heapq, collections, math
+
+class FlowField:
+    """Carte des distances vers l'accès le plus proche d'un biome, calculée sur les chunks chargés.
+
+    Les sources sont les tuiles franchissables adjacentes au biome (ex : les berges pour l'eau).
+    Pour chaque tuile intégrée, on conserve la distance, la source la plus proche et le pas suivant.
+    """
+    DIRECTIONS = [(1, 0), (-1, 0), (0, 1), (0, -1)]
+
+    def __init__(self, world, biome):
+        self.world = world
+        self.biome = world.biomes.get_id(biome)  # Identifiant du biome recherché
+        self.costs = world.biomes.costs.tolist()  # Coût d'entrée dans une tuile, par identifiant de biome
+        self.chunk_size = world.config['chunk_size']
+        self.chunks = set()  # Coordonnées des chunks déjà intégrés
+        self.distance = {}  # Tuile -> distance jusqu'à la source la plus proche
+        self.source = {}  # Tuile -> source la plus proche
+        self.next_step = {}  # Tuile -> tuile suivante en direction de la source
+
+    def get_biome(self, x, y):
+        """Retourne l'identifiant du biome de la tuile (x, y) si son chunk est chargé, None sinon."""
+        chunk = self.world.loaded_chunks.get((x // self.chunk_size, y // self.chunk_size))
+        if chunk is None or chunk.tiles is None:
+            return None
+        return self.world.biomes.get_tile_id(chunk, x % self.chunk_size, y % self.chunk_size)
+
+    def is_integrated(self, x, y):
+        """Vérifie si la tuile appartient à un chunk intégré au champ."""
+        return (x // self.chunk_size, y // self.chunk_size) in self.chunks
+
+    def is_source(self, x, y):
+        """Une source est une tuile franchissable adjacente à une tuile du biome recherché."""
+        biome = self.get_biome(x, y)
+        if biome is None or biome == self.biome or self.costs[biome] == float('inf'):
+            return False
+        return any(self.get_biome(x + dx, y + dy) == self.biome for dx, dy in self.DIRECTIONS)
+
+    def add_chunk(self, chunk):
+        """Intègre un chunk et propage les distances de façon incrémentale."""
+        if (chunk.x, chunk.y) in self.chunks:
+            return
+        self.chunks.add((chunk.x, chunk.y))
+        heap = []
+
+        # Sources du nouveau chunk
+        for x, y, tile in chunk.get_tiles():
+            if self.is_source(x, y):
+                self.set_source(heap, (x, y))
+
+        # Tuiles des chunks voisins déjà intégrés le long de la bordure commune :
+        # elles peuvent devenir des sources et propagent leur distance dans le nouveau chunk
+        x0, y0 = chunk.x_offset, chunk.y_offset
+        size = self.chunk_size
+        border = [(x0 - 1, y0 + i) for i in range(size)] + [(x0 + size, y0 + i) for i in range(size)] + \
+                 [(x0 + i, y0 - 1) for i in range(size)] + [(x0 + i, y0 + size) for i in range(size)]
+        for node in border:
+            if not self.is_integrated(*node):
+                continue
+            if self.distance.get(node) != 0 and self.is_source(*node):
+                self.set_source(heap, node)
+            elif node in self.distance:
+                heapq.heappush(heap, (self.distance[node], node))
+
+        self.propagate(heap)
+
+    def set_source(self, heap, node):
+        """Marque une tuile comme source de distance nulle."""
+        self.distance[node] = 0
+        self.source[node] = node
+        self.next_step.pop(node, None)
+        heapq.heappush(heap, (0, node))
+
+    def propagate(self, heap):
+        """Dijkstra inverse depuis les nœuds du tas ; ne fait que diminuer des distances existantes."""
+        while heap:
+            dist, node = heapq.heappop(heap)
+            if dist > self.distance.get(node, float('inf')):
+                continue
+            # Coût pour entrer dans `node` depuis un voisin
+            step_cost = self.costs[self.get_biome(*node)]
+            x, y = node
+            for dx, dy in self.DIRECTIONS:
+                neighbor = (x + dx, y + dy)
+                if not self.is_integrated(*neighbor):
+                    continue
+                biome = self.get_biome(*neighbor)
+                if self.costs[biome] == float('inf'):
+                    continue
+                new_dist = dist + step_cost
+                if new_dist < self.distance.get(neighbor, float('inf')):
+                    self.distance[neighbor] = new_dist
+                    self.source[neighbor] = self.source[node]
+                    self.next_step[neighbor] = node
+                    heapq.heappush(heap, (new_dist, neighbor))
+
+    def lookup(self, x, y):
+        """Retourne la tuile contenant la position (x, y)."""
+        return (int(math.floor(x)), int(math.floor(y)))
+
+    def nearest_source(self, x, y):
+        """Retourne la source atteignable la plus proche de (x, y), ou None."""
+        return self.source.get(self.lookup(x, y))
+
+    def get_next_step(self, x, y):
+        """Retourne la tuile suivante vers la source la plus proche, ou None."""
+        return self.next_step.get(self.lookup(x, y))
+
+class FlowFieldManager:
+    """Partage les cartes de distance par biome entre tous les PNJ du monde."""
+    def __init__(self, world, chunks_per_tick=2):
+        self.world = world
+        self.chunks_per_tick = chunks_per_tick  # Budget d'intégration par tick
+        self.fields = {}  # Biome -> FlowField
+        self.pending = collections.deque()  # Chunks chargés en attente d'intégration
+
+    def notify_chunk_loaded(self, chunk):
+        """Signale un nouveau chunk ; peut être appelé depuis n'importe quel thread."""
+        self.pending.append(chunk)
+
+    def get_field(self, biome):
+        """Retourne le champ d'un biome, créé au premier appel à partir des chunks chargés."""
+        if biome not in self.fields:
+            self.fields[biome] = FlowField(self.world, biome)
+            self.pending.extend(list(self.world.loaded_chunks.values()))
+        return self.fields[biome]
+
+    def update(self):
+        """Intègre un nombre limité de chunks en attente dans chaque champ (thread des entités)."""
+        if not self.fields:
+            self.pending.clear()
+            return
+        for _ in range(min(self.chunks_per_tick, len(self.pending))):
+            chunk = self.pending.popleft()
+            for field in self.fields.values():
+                field.add_chunk(chunk)
@@ -0,0 +1,265 @@
+import heapq
+import math
+import numpy as np
+from vision import get_passable_grid
+
+def ring_chunks(center_x, center_y, ring):
+    """Retourne les coordonnées des chunks situés à la distance de Tchebychev `ring` du centre."""
+    if ring == 0:
+        return [(center_x, center_y)]
+    cells = []
+    for i in range(-ring, ring + 1):
+        cells.append((center_x + i, center_y - ring))
+        cells.append((center_x + i, center_y + ring))
+    for j in range(-ring + 1, ring):
+        cells.append((center_x - ring, center_y + j))
+        cells.append((center_x + ring, center_y + j))
+    return cells
+
+class FogOfWar:
+    """Brouillard de guerre d'un PNJ : chunks découverts et tuiles vues, conservés sous forme de bitmaps.
+
+    Le bitmap des chunks est une grille booléenne extensible dont la case [0, 0] correspond au chunk
+    `origin` ; les tuiles vues sont conservées par chunk, dans une grille (chunk_size x chunk_size).
+    Le contour de la zone découverte est tenu à jour à chaque découverte : un côté de chunk appartient
+    au contour si un seul des deux chunks qu'il sépare est connu, d'où un simple basculement (XOR)
+    des quatre côtés du chunk découvert.
+    """
+    def __init__(self, chunk_size, initial_size=8):
+        self.chunk_size = chunk_size
+        self.chunks = np.zeros((initial_size, initial_size), dtype=bool)  # Chunks découverts
+        self.origin = None  # Coordonnées du chunk de la case [0, 0]
+        self.tiles = {}  # (chunk_x, chunk_y) -> bitmap des tuiles déjà vues
+        self.visible = None  # Bitmap des tuiles visibles au dernier tick
+        self.visible_origin = (0, 0)  # Coordonnées globales de la case [0, 0] de `visible`
+        self.visible_version = 0  # Incrémentée quand les tuiles visibles changent
+        self.version = 0  # Incrémentée à chaque nouveau chunk découvert
+        # Contour : côtés unitaires en chunks, ('v', x, y) de (x, y) à (x, y + 1) et ('h', x, y) de (x, y) à (x + 1, y),
+        # rangés dans les premières lignes d'un tableau de segments en coordonnées monde
+        self.edge_rows = {}  # Côté -> ligne du tableau
+        self.edge_sides = []  # Ligne du tableau -> côté
+        self.edges = np.zeros((16, 2, 2))
+        self.bounds = None  # Boîte englobante (x_min, y_min, x_max, y_max) de la zone découverte, en coordonnées monde
+
+    def grow(self, chunk_x, chunk_y):
+        """Agrandit le bitmap des chunks (en doublant sa taille) pour qu'il contienne (chunk_x, chunk_y)."""
+        if self.origin is None:
+            half = self.chunks.shape[0] // 2
+            self.origin = (chunk_x - half, chunk_y - half)
+        origin_x, origin_y = self.origin
+        width, height = self.chunks.shape
+        if 0 <= chunk_x - origin_x < width and 0 <= chunk_y - origin_y < height:
+            return
+        while not (origin_x <= chunk_x < origin_x + width and origin_y <= chunk_y < origin_y + height):
+            origin_x -= width // 2
+            origin_y -= height // 2
+            width, height = width * 2, height * 2
+        chunks = np.zeros((width, height), dtype=bool)
+        offset_x, offset_y = self.origin[0] - origin_x, self.origin[1] - origin_y
+        chunks[offset_x:offset_x + self.chunks.shape[0], offset_y:offset_y + self.chunks.shape[1]] = self.chunks
+        self.chunks, self.origin = chunks, (origin_x, origin_y)
+
+    def is_chunk_known(self, chunk_x, chunk_y):
+        """Vérifie si un chunk a été découvert (comparaisons entières uniquement)."""
+        if self.origin is None:
+            return False
+        index_x, index_y = chunk_x - self.origin[0], chunk_y - self.origin[1]
+        width, height = self.chunks.shape
+        return 0 <= index_x < width and 0 <= index_y < height and bool(self.chunks[index_x, index_y])
+
+    def mark_chunk(self, chunk_x, chunk_y):
+        """Marque un chunk comme découvert ; retourne True s'il ne l'était pas encore."""
+        if self.is_chunk_known(chunk_x, chunk_y):
+            return False
+        self.grow(chunk_x, chunk_y)
+        self.chunks[chunk_x - self.origin[0], chunk_y - self.origin[1]] = True
+        for side in (('v', chunk_x, chunk_y), ('v', chunk_x + 1, chunk_y), ('h', chunk_x, chunk_y), ('h', chunk_x, chunk_y + 1)):
+            self.toggle_edge(side)
+        size = self.chunk_size
+        left, top, right, bottom = chunk_x * size, chunk_y * size, (chunk_x + 1) * size, (chunk_y + 1) * size
+        if self.bounds is not None:
+            left, top = min(left, self.bounds[0]), min(top, self.bounds[1])
+            right, bottom = max(right, self.bounds[2]), max(bottom, self.bounds[3])
+        self.bounds = (left, top, right, bottom)
+        self.version += 1
+        return True
+
+    def mark_visible(self, visible_tiles):
+        """Enregistre les tuiles visibles du tick ; retourne les chunks touchés par la vue."""
+        if visible_tiles is None or not len(visible_tiles):
+            if self.visible is not None:
+                self.visible = None
+                self.visible_version += 1
+            return []
+        low, high = visible_tiles.min(axis=0), visible_tiles.max(axis=0)
+        visible = np.zeros(high - low + 1, dtype=bool)
+        visible[visible_tiles[:, 0] - low[0], visible_tiles[:, 1] - low[1]] = True
+        origin = (int(low[0]), int(low[1]))
+        if self.visible is None or origin != self.visible_origin or not np.array_equal(visible, self.visible):
+            self.visible_version += 1
+        self.visible, self.visible_origin = visible, origin
+
+        # Reporter les tuiles vues dans le bitmap de chaque chunk de la boîte englobante
+        size = self.chunk_size
+        touched = []
+        for chunk_x in range(int(low[0]) // size, int(high[0]) // size + 1):
+            for chunk_y in range(int(low[1]) // size, int(high[1]) // size + 1):
+                x0, y0 = max(chunk_x * size, low[0]), max(chunk_y * size, low[1])
+                x1, y1 = min((chunk_x + 1) * size, high[0] + 1), min((chunk_y + 1) * size, high[1] + 1)
+                window = visible[x0 - low[0]:x1 - low[0], y0 - low[1]:y1 - low[1]]
+                if not window.any():
+                    continue
+                tiles = self.tiles.get((chunk_x, chunk_y))
+                if tiles is None:
+                    tiles = self.tiles[(chunk_x, chunk_y)] = np.zeros((size, size), dtype=bool)
+                tiles[x0 - chunk_x * size:x1 - chunk_x * size, y0 - chunk_y * size:y1 - chunk_y * size] |= window
+                touched.append((chunk_x, chunk_y))
+        return touched
+
+    def is_tile_seen(self, x, y):
+        """Vérifie si la tuile globale (x, y) a déjà été vue."""
+        tiles = self.tiles.get((x // self.chunk_size, y // self.chunk_size))
+        return tiles is not None and bool(tiles[x % self.chunk_size, y % self.chunk_size])
+
+    def toggle_edge(self, side):
+        """Ajoute un côté unitaire au contour, ou l'en retire s'il y était déjà (retrait par échange avec la dernière ligne)."""
+        row = self.edge_rows.pop(side, None)
+        count = len(self.edge_rows)
+        if row is not None:
+            last = self.edge_sides.pop()
+            if row != count:
+                self.edges[row] = self.edges[count]
+                self.edge_sides[row] = last
+                self.edge_rows[last] = row
+            return
+        if count == len(self.edges):
+            self.edges = np.concatenate([self.edges, np.zeros_like(self.edges)])
+        axis, x, y = side
+        size = self.chunk_size
+        end = (x, y + 1) if axis == 'v' else (x + 1, y)
+        self.edges[count] = ((x * size, y * size), (end[0] * size, end[1] * size))
+        self.edge_rows[side] = count
+        self.edge_sides.append(side)
+
+    def get_edges(self):
+        """Retourne les segments du contour de la zone découverte : tableau (n, 2, 2) en coordonnées monde."""
+        return self.edges[:len(self.edge_rows)]
+
+    def get_bounds(self):
+        """Retourne la boîte englobante de la zone découverte en coordonnées monde, ou None."""
+        return self.bounds
+
+class ExplorationFrontier:
+    """Frontière d'exploration d'un PNJ : chunks inconnus adjacents à un chunk connu franchissable.
+
+    Chaque chunk de la frontière est associé à une tuile d'entrée franchissable, au bord du chunk connu
+    qui lui fait face. La frontière est mise à jour à chaque découverte (4 voisins à examiner). Une entrée
+    qui échoue max_failures fois est retirée ; un autre chunk découvert à côté peut en proposer une nouvelle.
+    """
+    DIRECTIONS = [(1, 0), (-1, 0), (0, 1), (0, -1)]
+
+    def __init__(self, world, fog, max_failures=3):
+        self.world = world
+        self.fog = fog
+        self.chunk_size = fog.chunk_size
+        self.entries = {}  # Chunk inconnu -> position d'entrée (centre de tuile)
+        self.targets = {}  # Position d'entrée -> chunk inconnu correspondant
+        self.failures = {}  # Chunk inconnu -> nombre de tentatives infructueuses
+        self.max_failures = max_failures
+        self.heap = []  # (score depuis la position de référence, chunk, entrée, échecs), éléments périmés écartés au passage
+        self.reference = None  # Position depuis laquelle les scores du tas sont calculés
+
+    def add_known_chunk(self, chunk_x, chunk_y):
+        """Retire le chunk découvert de la frontière et y ajoute ses voisins inconnus accessibles."""
+        self.remove((chunk_x, chunk_y))
+        grid = get_passable_grid(self.world.biomes, self.world.get_chunk(chunk_x, chunk_y))
+        for dx, dy in self.DIRECTIONS:
+            neighbor = (chunk_x + dx, chunk_y + dy)
+            if self.fog.is_chunk_known(*neighbor):
+                continue
+            # Garder une entrée existante, sauf si elle s'est révélée inaccessible
+            if neighbor in self.entries and not self.failures.get(neighbor):
+                continue
+            entry = self.border_entry(chunk_x, chunk_y, grid, dx, dy)
+            if entry:
+                self.remove(neighbor)
+                self.entries[neighbor] = entry
+                self.targets[entry] = neighbor
+                self.push(neighbor)
+
+    def border_entry(self, chunk_x, chunk_y, grid, dx, dy):
+        """Retourne la tuile franchissable médiane du bord du chunk tourné vers (dx, dy), ou None."""
+        size = self.chunk_size
+        if dx:
+            line = grid[size - 1 if dx > 0 else 0, :]
+        else:
+            line = grid[:, size - 1 if dy > 0 else 0]
+        passable = np.flatnonzero(line)
+        if not len(passable):
+            return None
+        offset = int(passable[len(passable) // 2])
+        local_x = (size - 1 if dx > 0 else 0) if dx else offset
+        local_y = (size - 1 if dy > 0 else 0) if dy else offset
+        return (chunk_x * size + local_x + 0.5, chunk_y * size + local_y + 0.5)
+
+    def remove(self, chunk):
+        """Retire un chunk de la frontière."""
+        entry = self.entries.pop(chunk, None)
+        if entry is not None:
+            self.targets.pop(entry, None)
+        self.failures.pop(chunk, None)
+
+    def report_failure(self, target):
+        """Signale qu'une entrée n'a pas permis de découvrir son chunk ; retourne True si c'était une entrée."""
+        chunk = self.targets.get(target)
+        if chunk is None:
+            return False
+        self.failures[chunk] = self.failures.get(chunk, 0) + 1
+        if self.failures[chunk] >= self.max_failures:
+            self.remove(chunk)
+        else:
+            self.push(chunk)
+        return True
+
+    def score(self, x, y, chunk):
+        """Distance de (x, y) à l'entrée du chunk, pénalisée d'un chunk par échec."""
+        entry = self.entries[chunk]
+        return math.sqrt((x - entry[0]) ** 2 + (y - entry[1]) ** 2) + self.failures.get(chunk, 0) * self.chunk_size
+
+    def push(self, chunk):
+        """Ajoute l'entrée courante d'un chunk au tas ; l'élément qu'elle remplace devient périmé."""
+        if self.reference is not None:
+            heapq.heappush(self.heap, (self.score(*self.reference, chunk), chunk, self.entries[chunk], self.failures.get(chunk, 0)))
+
+    def is_live(self, item):
+        """Indique si un élément du tas correspond encore à l'entrée et aux échecs courants de son chunk."""
+        _, chunk, entry, failures = item
+        return self.entries.get(chunk) == entry and self.failures.get(chunk, 0) == failures
+
+    def next_target(self, x, y):
+        """Retourne l'entrée de frontière la mieux classée (distance pénalisée par les échecs), ou None.
+
+        Les scores du tas sont calculés depuis une position de référence ; tant que le PNJ s'en écarte de
+        moins d'un chunk, un score réel ne peut être inférieur au score du tas moins cet écart, ce qui borne
+        les éléments à examiner. Au-delà, le tas est reconstruit depuis la position du PNJ.
+        """
+        if not self.entries:
+            return None
+        if self.reference is None or math.hypot(x - self.reference[0], y - self.reference[1]) > self.chunk_size:
+            self.reference = (x, y)
+            self.heap = [(self.score(x, y, chunk), chunk, entry, self.failures.get(chunk, 0)) for chunk, entry in self.entries.items()]
+            heapq.heapify(self.heap)
+        drift = math.hypot(x - self.reference[0], y - self.reference[1])
+        best, best_score = None, float('inf')
+        examined = []
+        while self.heap and self.heap[0][0] - drift < best_score:
+            item = heapq.heappop(self.heap)
+            if not self.is_live(item):
+                continue
+            examined.append(item)
+            score = self.score(x, y, item[1])
+            if score < best_score:
+                best, best_score = item[2], score
+        for item in examined:
+            heapq.heappush(self.heap, item)
+        return best
@@ -1,29 +1,35 @@
 import pygame
 
+def draw_item(screen, screen_x, screen_y, size_in_pixels, color, shape='circle'):
+    """Dessine un item centré en (screen_x, screen_y) ; partagé avec les tampons pré-rendus de la caméra."""
+    # Dessiner l'entité en fonction de la forme spécifiée
+    if shape == 'circle':
+        pygame.draw.circle(screen, color, (screen_x, screen_y), size_in_pixels // 2)
+    elif shape == 'square':
+        pygame.draw.rect(screen, color, (screen_x - size_in_pixels // 2, screen_y - size_in_pixels // 2, size_in_pixels, size_in_pixels))
+    elif shape == 'triangle':
+        point1 = (screen_x, screen_y - size_in_pixels // 2)
+        point2 = (screen_x - size_in_pixels // 2, screen_y + size_in_pixels // 2)
+        point3 = (screen_x + size_in_pixels // 2, screen_y + size_in_pixels // 2)
+        pygame.draw.polygon(screen, color, [point1, point2, point3])
+    # Ajouter d'autres formes si nécessaire
+    else:
+        raise ValueError(f"Forme non supportée: {shape}")
+
 class Item:
+    color = (100, 20, 150)  # Couleur et forme dessinées par le rendu
+    shape = 'circle'
+
     def __init__(self, name, weight=1, quantity=1):
         self.name = name
         self.weight = weight
         self.quantity = quantity
     
-    def render(self, screen, screen_x, screen_y, scale = 0.5, color=(100, 20, 150), shape='circle', **kwargs):
+    def render(self, screen, screen_x, screen_y, scale = 0.5, color=None, shape=None, **kwargs):
         """Affiche graphiquement l'item sur l'écran avec des options de personnalisation."""
         # Convertir la position en pixels en fonction de l'échelle
         size_in_pixels = int(scale * 0.5)
-
-        # Dessiner l'entité en fonction de la forme spécifiée
-        if shape == 'circle':
-            pygame.draw.circle(screen, color, (screen_x, screen_y), size_in_pixels // 2)
-        elif shape == 'square':
-            pygame.draw.rect(screen, color, (screen_x - size_in_pixels // 2, screen_y - size_in_pixels // 2, size_in_pixels, size_in_pixels))
-        elif shape == 'triangle':
-            point1 = (screen_x, screen_y - size_in_pixels // 2)
-            point2 = (screen_x - size_in_pixels // 2, screen_y + size_in_pixels // 2)
-            point3 = (screen_x + size_in_pixels // 2, screen_y + size_in_pixels // 2)
-            pygame.draw.polygon(screen, color, [point1, point2, point3])
-        # Ajouter d'autres formes si nécessaire
-        else:
-            raise ValueError(f"Forme non supportée: {shape}")
+        draw_item(screen, screen_x, screen_y, size_in_pixels, color or self.color, shape or self.shape)
 
     def __repr__(self):
         return f"{self.name} (x{self.quantity})"
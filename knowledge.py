@@ -0,0 +1,50 @@
+import threading
+from types import MappingProxyType
+
+class ChunkFacts:
+    """Faits immuables sur les ressources d'un chunk, partagés par tous les PNJ."""
+    __slots__ = ('id', 'x', 'y', 'resources', 'summary')
+
+    def __init__(self, chunk_id, chunk):
+        summary = chunk.get_resource_summary()
+        object.__setattr__(self, 'id', chunk_id)
+        object.__setattr__(self, 'x', chunk.x)
+        object.__setattr__(self, 'y', chunk.y)
+        object.__setattr__(self, 'resources', frozenset(summary))
+        object.__setattr__(self, 'summary', MappingProxyType(dict(summary)))  # Biome -> tuiles de bordure
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Les faits d'un chunk sont immuables.")
+
+    def __repr__(self):
+        return f"ChunkFacts {self.id} ({self.x}, {self.y}): {sorted(self.resources)}"
+
+class KnowledgeBase:
+    """Registre mondial des faits de chunks ; chaque PNJ n'en retient que les identifiants connus."""
+    def __init__(self, world):
+        self.world = world
+        self.ids = {}  # Coordonnées du chunk -> identifiant entier
+        self.facts = []  # Identifiant -> ChunkFacts
+        self.lock = threading.Lock()
+
+    def register(self, chunk_x, chunk_y):
+        """Retourne l'identifiant du chunk, en enregistrant ses faits au premier appel."""
+        chunk_id = self.ids.get((chunk_x, chunk_y))
+        if chunk_id is not None:
+            return chunk_id
+        chunk = self.world.get_chunk(chunk_x, chunk_y)
+        with self.lock:
+            chunk_id = self.ids.get((chunk_x, chunk_y))
+            if chunk_id is None:
+                chunk_id = len(self.facts)
+                self.facts.append(ChunkFacts(chunk_id, chunk))
+                self.ids[(chunk_x, chunk_y)] = chunk_id
+        return chunk_id
+
+    def get_id(self, chunk_x, chunk_y):
+        """Retourne l'identifiant d'un chunk déjà enregistré, ou None."""
+        return self.ids.get((chunk_x, chunk_y))
+
+    def get_facts(self, chunk_id):
+        """Retourne les faits associés à un identifiant."""
+        return self.facts[chunk_id]
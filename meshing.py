@@ -0,0 +1,37 @@
+import numpy as np
+
+def greedy_mesh_grid(ids):
+    """Fusionne une grille carrée d'identifiants de biome en rectangles (x, y, largeur, hauteur, identifiant).
+
+    Les plages de même biome sont d'abord extraites ligne par ligne (le long de x) ; une plage prolonge
+    le rectangle de la ligne précédente si elle a exactement les mêmes bornes et le même biome. Tout est
+    calculé sur des tableaux NumPy, sans parcourir les objets Tile.
+    """
+    width, height = ids.shape
+    # Début de plage : première colonne ou changement de biome par rapport à la tuile précédente en x
+    starts = np.ones((width + 1, height), dtype=bool)
+    starts[1:width] = ids[1:] != ids[:-1]
+
+    # Une plage prolonge celle du dessus si tuiles et débuts de plage sont identiques sur toute sa longueur
+    # et si la plage du dessus s'arrête au même endroit
+    same = np.zeros((width, height), dtype=bool)
+    same[:, 1:] = (ids[:, 1:] == ids[:, :-1]) & (starts[:width, 1:] == starts[:width, :-1])
+    mismatches = np.zeros((width + 1, height), dtype=np.int32)
+    mismatches[1:] = np.cumsum(~same, axis=0)
+
+    run_y, run_x = np.nonzero(starts[:width].T)  # Plages triées par ligne puis par colonne
+    next_start = np.append(run_x[1:], width)
+    run_end = np.where(np.append(run_y[1:], height) == run_y, next_start, width)
+    continues = (run_y > 0) & (mismatches[run_end, run_y] == mismatches[run_x, run_y]) & starts[run_end, np.maximum(run_y - 1, 0)]
+
+    # Hauteur des rectangles : jusqu'à la première ligne suivante qui ne prolonge pas la plage de départ
+    # (même colonne de début), trouvée par un minimum cumulé en partant du bas
+    extends = np.zeros((width, height + 1), dtype=bool)
+    extends[run_x[continues], run_y[continues]] = True
+    stops = np.where(extends, height, np.arange(height + 1))
+    next_stop = np.minimum.accumulate(stops[:, ::-1], axis=1)[:, ::-1]
+
+    first = ~continues
+    x, y, end = run_x[first], run_y[first], run_end[first]
+    rect_heights = next_stop[x, y + 1] - y
+    return list(zip(x.tolist(), y.tolist(), (end - x).tolist(), rect_heights.tolist(), ids[x, y].tolist()))
@@ -1,7 +1,15 @@
-import json, pygame, uuid, perlin_noise, os, json, numpy as np
+import json, pygame, uuid, perlin_noise, os, json, random, itertools, collections, time, numpy as np
 from chunk_ import Chunk
-from shapely.geometry import Polygon,MultiPolygon
-from shapely.ops import unary_union
+from path_service import PathRequestService
+from flowfield import FlowFieldManager
+from vision import cast_rays_batch
+from knowledge import KnowledgeBase
+from needs import NeedsMatrix
+from biomes import BiomeRegistry
+from overview import OverviewMap
+from snapshot import SnapshotBuffer
+from entity import draw_entity, make_red_filter
+from item import draw_item
 
 # Charger la configuration depuis un fichier JSON
 def load_config(file_path):
@@ -45,8 +53,24 @@ class World:
         self.chunk_lock = self.__dict__.get("chunk_lock", None)
         self.entity_lock = self.__dict__.get("entity_lock", None)
         self.event_manager = self.__dict__.get("event_manager", None)
+        self.recorder = self.__dict__.get("recorder", None)  # Enregistreur de la partie (voir replay.py)
+        # Graine du générateur aléatoire du monde : toute la simulation tire ses nombres de self.rng
+        self.seed = self.__dict__.get("seed", config.get('simulation_seed'))
+        if self.seed is None:
+            self.seed = random.randrange(2 ** 32)
+        self.rng = random.Random(self.seed)
+        # Mode déterministe : identifiants séquentiels et pathfinding résolu dans le thread des entités
+        self.deterministic = self.__dict__.get("deterministic", False)
+        self.id_counter = itertools.count(1)
+        self.biomes = BiomeRegistry(config['biomes'])  # Tables de couleur, de coût et de franchissabilité par biome
+        self.path_service = PathRequestService(self, config.get('pathfinding_workers', 2), deterministic=self.deterministic)
+        self.flow_fields = FlowFieldManager(self, config.get('flow_field_chunks_per_tick', 2))
+        self.knowledge = KnowledgeBase(self)
+        self.needs = NeedsMatrix()  # Besoins de tous les PNJ, mis à jour en bloc à chaque tick
+        self.overview = OverviewMap(self, config.get('overview_noise_resolution', 4), config.get('overview_samples_per_frame', 512))
+        self.snapshots = SnapshotBuffer(config.get('snapshot_buffer_size', 3))  # Instantanés publiés pour le thread de rendu
         
-        self.chunk_file = f'data/chunks_{config["perlin"]['seed']}_{config["perlin"]['octaves']}.json'  # Fichier pour stocker les chunks
+        self.chunk_file = self.__dict__.get("chunk_file", f'data/chunks_{config["perlin"]['seed']}_{config["perlin"]['octaves']}.json')  # Fichier pour stocker les chunks
         self.init_loaded_chunks(config['initial_chunk_radius'])
         # self.load_chunks_from_file()
     
@@ -92,7 +116,7 @@ class World:
                     chunks_data = json.load(f)
                     for key, data in chunks_data.items():
                         chunk_x, chunk_y = map(int, key.split('_'))
-                        self.loaded_chunks[(chunk_x, chunk_y)] = Chunk.from_dict(data, self.noise_generator, self.config, self.chunk_lock, self.entity_lock)
+                        self.loaded_chunks[(chunk_x, chunk_y)] = Chunk.from_dict(data, self.noise_generator, self.config, self.chunk_lock, self.entity_lock, self.biomes)
             except json.JSONDecodeError as e:
                 print(f"Erreur de décodage JSON pour le fichier {self.chunk_file} : {e}")
                 # Supprimer le fichier
@@ -113,6 +137,9 @@ class World:
         chunk_y = int(entity.y) // self.config['chunk_size']
         chunk = self.get_chunk(chunk_x, chunk_y)
         chunk.add_entity(entity.entity_type)
+        
+        if self.recorder:
+            self.recorder.record_spawn(entity)
 
     def add_entity_to_tile(self, tile):
         """Ajoute une entité à une tuile et l'enregistre dans la liste."""
@@ -143,13 +170,16 @@ class World:
     
     def generate_id(self):
         """Génère un ID unique pour une entité."""
+        if self.deterministic:
+            return str(uuid.UUID(int=next(self.id_counter)))
         return str(uuid.uuid1())
     
     def get_chunk(self, chunk_x, chunk_y):
         """Retourne un chunk, le génère si nécessaire."""
         if (chunk_x, chunk_y) not in self.loaded_chunks:
             # Générer et stocker le chunk s'il n'existe pas encore
-            self.loaded_chunks[(chunk_x, chunk_y)] = Chunk(chunk_x, chunk_y , self.noise_generator, self.config, chunk_lock=self.chunk_lock, entity_lock=self.entity_lock)
+            self.loaded_chunks[(chunk_x, chunk_y)] = Chunk(chunk_x, chunk_y , self.noise_generator, self.config, chunk_lock=self.chunk_lock, entity_lock=self.entity_lock, registry=self.biomes)
+            self.flow_fields.notify_chunk_loaded(self.loaded_chunks[(chunk_x, chunk_y)])
         return self.loaded_chunks[(chunk_x, chunk_y)]
     
     def get_chunks_around(self,x,y,radius):
@@ -190,6 +220,12 @@ class World:
         local_x = int(x) % self.config['chunk_size']
         local_y = int(y) % self.config['chunk_size']
         return chunk.tiles[local_x][local_y]
+
+    def update_tile(self, x, y, new_tile):
+        """Remplace la tuile aux coordonnées globales (x, y) et invalide la visibilité mémorisée des chemins."""
+        chunk = self.get_chunk_from_position(x, y)
+        chunk.update_tile(int(x) % self.config['chunk_size'], int(y) % self.config['chunk_size'], new_tile, self.biomes)
+        self.path_service.invalidate_terrain()
     
     # def get_resources_in_range(self, x, y, radius):
     #     """Retourne les ressources spécifiques dans un rayon autour de (x, y)."""
@@ -247,6 +283,8 @@ class World:
         for key, entity_list in self.entities.items():
             if entity in entity_list:
                 self.entities[key].remove(entity)
+        entity.unregister_from_events()
+        self.needs.release(entity)
    
     def search_for_entities(self, x, y, radius, entity_type):
         """Recherche des entités dans un rayon donné autour des coordonnées (x, y)."""
@@ -259,17 +297,39 @@ class World:
     
     def update_entities(self, delta_time):
         """Met à jour toutes les entités du monde."""
+        # Livrer les chemins calculés en arrière-plan avant la mise à jour des entités
+        self.path_service.dispatch_results()
+        # Intégrer les nouveaux chunks aux cartes de distance partagées
+        self.flow_fields.update()
+        
+        # Diminuer les besoins de tous les PNJ en un seul calcul ; seuls ceux dont la meilleure action
+        # a changé sont prévenus
+        for pnj, action in self.needs.update(delta_time):
+            pnj.behavior_manager.on_best_action_changed(action)
+        
+        # Lancer les rayons de vision de tous les PNJ en un seul lot
+        pnjs = self.entities.get("PNJ", [])
+        for pnj, (visible_tiles, hit_points) in zip(pnjs, cast_rays_batch(self, pnjs)):
+            pnj.set_vision(visible_tiles, hit_points)
+        
         entity_keys = list(self.entities.keys())
         for entity_type in entity_keys:
             entity_list = self.entities.get(entity_type, [])
             for entity in entity_list:
                 entity.update(delta_time)
         
+        # Livrer en bloc les événements émis pendant le tick (ou depuis d'autres threads)
+        if self.event_manager:
+            self.event_manager.dispatch_events()
+        
         # Vérifier la présence des entités sur les tuiles
         self.entity_is_present()
         
         # Vérifier la présence des entités sur les tuiles
         self.entity_is_not_present()
+        
+        # Publier l'état du tick pour le rendu, qui ne lit plus les entités vivantes
+        self.snapshots.capture(self)
 
 # ======================================================================================
 # ================================= Class CAMERA =======================================
@@ -277,6 +337,9 @@ class World:
 
 class Camera:
     """Classe gérant la caméra comme entité invisible et fixe, les chunks se déplacent autour d'elle."""
+    # Type d'élément de la scène -> phase du rendu à laquelle son dessin est compté (voir phase_times)
+    RENDER_PHASES = {"item": "items", "entity": "entities", "discovered": "overlays", "visible": "overlays",
+                     "path": "overlays", "hud": "hud"}
     def __init__(self, world, config, mode="free", start_x=0, start_y=0):
         self.world = world
         self.config = config
@@ -298,8 +361,44 @@ class Camera:
         self.screen = pygame.display.set_mode((self.screen_width, self.screen_height))
         self.font = pygame.font.Font(None, 24)
 
-        # Position précédente de la caméra pour détecter le mouvement
-        self.previous_camera_position = (-1, -1)
+        # Position et zoom précédents de la caméra pour détecter le mouvement
+        self.previous_camera_position = (-1, -1, -1)
+
+        # Rendu par zones modifiées : fond du terrain, éléments dessinés au rendu précédent, textes d'interface
+        self.background = pygame.Surface((self.screen_width, self.screen_height)).convert()
+        self.terrain_surfaces = []
+        self.previous_elements = {}
+        self.hud = {}
+        self.path_surfaces = {}  # Identifiant de PNJ -> (signature, surface) du tracé de son chemin
+
+        # Tampons des sprites (entités et items) pré-rendus à l'échelle courante : clé -> surface
+        self.stamps = {}
+        self.stamps_scale = self.scale
+
+        # Interface : surfaces des textes déjà rendus (LRU), dernière valeur affichée de chaque texte et
+        # surface unique où tous les textes sont composés, refaite seulement quand l'un d'eux change
+        self.text_surfaces = collections.OrderedDict()  # (texte, couleur) -> surface
+        self.text_cache_size = config.get('text_cache_size', 256)
+        self.hud_refresh_interval = config.get('hud_refresh_interval', 0.25)  # Délai minimal entre deux valeurs d'un texte numérique
+        self.hud_shown = {}  # Clé -> (instant d'affichage, (texte, position, couleur))
+        self.hud_layer = None  # (signature, rectangle, surface) de l'interface composée
+
+        # Surcouches des PNJ affichées : zone visible, chemin et cible, contour de la zone découverte
+        self.show_vision = config.get('show_vision', True)
+        self.show_paths = config.get('show_paths', True)
+        self.show_discovered = config.get('show_discovered', True)
+
+        # Temps de rendu cumulés par phase (terrain, items, entities, overlays, hud, scene), si c'est un dictionnaire
+        self.phase_times = None
+
+        # Cache LRU des chunks pré-rendus à l'échelle courante : (chunk_x, chunk_y) -> (surface, maillage)
+        self.chunk_surfaces = collections.OrderedDict()
+        self.chunk_surfaces_scale = self.scale
+        self.chunk_surface_margin = config.get('chunk_surface_margin', 16)  # Surfaces conservées hors de la vue
+
+        # En dessous de cette échelle, le terrain est rendu depuis la carte d'ensemble du monde (overview.py)
+        self.overview_scale = config.get('overview_scale', 2.0)
+        self.overview_surface = None  # (clé, surface) de la dernière carte d'ensemble affichée
 
     def set_mode(self, mode, target_pnj=None):
         """Définit le mode de la caméra (fixe, libre ou suivi d'un PNJ)."""
@@ -308,7 +407,8 @@ class Camera:
             self.target_pnj = target_pnj
 
     def has_camera_moved(self):
-        current_position = (self.camera_center_x, self.camera_center_y)
+        """Retourne True si la position ou le zoom de la caméra ont changé depuis le dernier appel."""
+        current_position = (self.camera_center_x, self.camera_center_y, self.scale)
         if current_position != self.previous_camera_position:
             self.previous_camera_position = current_position
             return True
@@ -316,9 +416,7 @@ class Camera:
 
     def entity_has_moved(self):
         # Vérifier si une entité a bougé 
-        for entity_list in self.world.entities.values():
-            for entity in entity_list:
-                return entity.has_moved()
+        return any(entity.has_moved() for entity_list in self.world.entities.values() for entity in entity_list)
 
     def update(self, delta_time):
         """Met à jour le zoom dynamique et le déplacement des chunks pour donner l'effet de mouvement."""
@@ -338,9 +436,11 @@ class Camera:
                 dy = 1.0 * self.config['camera_speed'] * delta_time
             self.move(dx, dy)
         elif self.mode == "follow" and self.target_pnj:
-            # Suivre la position du PNJ
-            self.camera_center_x = self.target_pnj.x
-            self.camera_center_y = self.target_pnj.y
+            # Suivre la position interpolée du PNJ, celle à laquelle il est dessiné
+            position = self.world.snapshots.position(self.target_pnj.id)
+            if position is None:
+                position = (self.target_pnj.x, self.target_pnj.y)
+            self.camera_center_x, self.camera_center_y = position
 
     def move(self, dx, dy):
         """Déplace la caméra en fonction du déplacement."""
@@ -392,173 +492,356 @@ class Camera:
 
         # return rectangles
 
-    def render(self):
-        """Affiche le monde et les PNJ avec déplacement du décor en fonction de la caméra."""
-        # self.screen.fill((135, 206, 235))  # Fond bleu ciel
+    def to_screen(self, x, y):
+        """Convertit des coordonnées monde en coordonnées écran (pixels entiers)."""
+        return (int((x - self.camera_center_x + self.screen_width / 2 / self.scale) * self.scale),
+                int((y - self.camera_center_y + self.screen_height / 2 / self.scale) * self.scale))
+
+    def to_screen_array(self, points):
+        """Convertit une liste de coordonnées monde en coordonnées écran (comme to_screen, en un seul calcul NumPy)."""
+        points = np.asarray(points, dtype=float).reshape(-1, 2)
+        center = np.array([self.camera_center_x, self.camera_center_y])
+        half_screen = np.array([self.screen_width / 2 / self.scale, self.screen_height / 2 / self.scale])
+        # astype(int) tronque vers zéro, comme int()
+        return ((points - center + half_screen) * self.scale).astype(int).tolist()
+
+    def get_stamp(self, key, half, draw):
+        """Retourne le tampon d'un sprite : surface transparente de côté 2 * half + 1, dessinée une fois par draw(surface)."""
+        stamp = self.stamps.get(key)
+        if stamp is None:
+            stamp = self.stamps[key] = pygame.Surface((2 * half + 1, 2 * half + 1), pygame.SRCALPHA)
+            draw(stamp)
+        return stamp
+
+    def get_red_filter(self, size):
+        """Retourne le filtre rouge des entités attaquées pour une taille en pixels, gardé avec les tampons du zoom courant."""
+        red_filter = self.stamps.get(("red_filter", size))
+        if red_filter is None:
+            red_filter = self.stamps[("red_filter", size)] = make_red_filter(size)
+        return red_filter
+
+    def draw_text(self, key, text, position, color=(255, 255, 255), refresh=0.0):
+        """Ajoute un texte d'interface au prochain rendu ; il n'est redessiné que si son contenu change.
+
+        Avec `refresh` (en secondes), un texte affiché n'est remplacé qu'une fois ce délai écoulé : les
+        valeurs numériques qui changent à chaque image restent lisibles et ne refont pas l'interface.
+        """
+        now = time.perf_counter()
+        value = (text, position, color)
+        shown = self.hud_shown.get(key)
+        if shown is not None and shown[1] != value and now - shown[0] < refresh:
+            value = shown[1]
+        elif shown is None or shown[1] != value:
+            self.hud_shown[key] = (now, value)
+        self.hud[key] = value
+
+    def get_text_surface(self, text, color):
+        """Retourne la surface d'un texte, rendue par la police une seule fois tant qu'elle reste dans le cache."""
+        key = (text, color)
+        surface = self.text_surfaces.get(key)
+        if surface is None:
+            surface = self.text_surfaces[key] = self.font.render(text, True, color)
+            if len(self.text_surfaces) > self.text_cache_size:
+                self.text_surfaces.popitem(last=False)
+        else:
+            self.text_surfaces.move_to_end(key)
+        return surface
+
+    def get_hud_layer(self):
+        """Retourne (signature, rectangle, surface) de l'interface : tous les textes composés dans une surface transparente."""
+        signature = tuple(self.hud.items())
+        if self.hud_layer is None or self.hud_layer[0] != signature:
+            texts = [(self.get_text_surface(text, color), position) for text, position, color in self.hud.values()]
+            rects = [surface.get_rect(topleft=position) for surface, position in texts]
+            rect = rects[0].unionall(rects[1:])
+            layer = pygame.Surface(rect.size, pygame.SRCALPHA)
+            layer.blits([(surface, (x - rect.x, y - rect.y)) for surface, (x, y) in texts], doreturn=False)
+            # Encodage RLE : la surface, surtout transparente, est copiée à chaque image mais rarement refaite
+            layer.set_alpha(255, pygame.RLEACCEL)
+            self.hud_layer = (signature, rect, layer)
+        return self.hud_layer
 
+    def render(self):
+        """Affiche le monde et les PNJ avec déplacement du décor en fonction de la caméra.
+
+        Le terrain est composé dans une surface de fond, refaite uniquement quand la caméra, le zoom ou un
+        chunk visible change. Les entités, leurs tracés et l'interface sont décrits par des éléments
+        (rectangle, signature) : seules les zones des éléments apparus, disparus ou modifiés sont
+        repeintes. Retourne la liste des rectangles de l'écran à mettre à jour (vide si rien n'a changé).
+
+        Entités, objets au sol et brouillards sont lus dans les instantanés publiés par la simulation
+        (snapshot.py), positions interpolées entre les deux derniers ticks ; seul le terrain vient des chunks.
+        """
+        snapshot, states = self.world.snapshots.interpolate()
+        if snapshot is None:
+            # Aucun tick publié : instantané de l'état initial
+            self.world.snapshots.capture(self.world)
+            snapshot, states = self.world.snapshots.interpolate()
+
+        begin = time.perf_counter()
         # Récupère tous les chunks visibles
         visible_chunks = self.get_visible_chunks()
         
-        rectangles = []
-        items = []
-        
-        for chunk in visible_chunks:
-            chunk_x, chunk_y = chunk
-            chunk = self.world.get_chunk(chunk_x, chunk_y)
-            rectangle = chunk.calculate_mesh(self.greedy_mesh_chunk)
-            items.append(chunk.dropped_items)
-            
-            # Ajouter l'offset du chunk pour le rendu
-            for x, y, w, h, tile_type in rectangle:
-                rectangles.append((x + chunk_x * self.chunk_size, y + chunk_y * self.chunk_size, w, h, tile_type))
-
-        # Rendre les rectangles optimisés
-        self.render_rectangles(rectangles)
+        blits = []
         
-        # Affichage des items droppés
-        for dropped_items in items:
-            for dropped_item in dropped_items:
-                # Affichage en fonction de la position dans le monde et de la position de la caméra
-                screen_x = int((dropped_item.position[0] - self.camera_center_x + self.screen_width / 2 / self.scale) * self.scale)
-                screen_y = int((dropped_item.position[1] - self.camera_center_y + self.screen_height / 2 / self.scale) * self.scale)
-                # Remplacer par un affichage de sprite ou autre représentation visuelle
-                dropped_item.item.render(self.screen, screen_x, screen_y, scale=self.scale)
-        
-        # Afficher les PNJ
-        for entity_list in self.world.entities.values():
-            for entity in entity_list:
-                screen_x = int((entity.x - self.camera_center_x + self.screen_width / 2 / self.scale) * self.scale)
-                screen_y = int((entity.y - self.camera_center_y + self.screen_height / 2 / self.scale) * self.scale)
-                entity.render(self.screen, self.scale, screen_x, screen_y)
-
-                # Afficher la zone découverte par le PNJ
-                if entity.entity_type == "PNJ":
-                    if entity.memory:
-                        chunks = entity.memory.get_all_discovered_chunks()
-                        # A partir des chunk découvert, afficher un polygone des bordures des chunks découverts
-                        polygons = []
-                        for chunk in chunks:
-                            chunk_x, chunk_y = chunk
-                            x = chunk_x * self.chunk_size
-                            y = chunk_y * self.chunk_size
-                            # Créer un polygone pour chaque chunk
-                            chunk_polygon = Polygon([
-                                (x, y),
-                                (x + self.chunk_size, y),
-                                (x + self.chunk_size, y + self.chunk_size),
-                                (x, y + self.chunk_size)
-                            ])
-                            polygons.append(chunk_polygon)
-                        
-                        if polygons:
-                            if isinstance(polygons, MultiPolygon):
-                                polygons = polygons.geoms   
-
-                            unified_polygon = unary_union(polygons)
-                            
-                            # Vérifier si le résultat est un Polygon ou un MultiPolygon
-                            if isinstance(unified_polygon, Polygon):
-                                # Convertir les points en coordonnées d'écran
-                                screen_points = [
-                                    (
-                                        int((x - self.camera_center_x + self.screen_width / 2 / self.scale) * self.scale),
-                                        int((y - self.camera_center_y + self.screen_height / 2 / self.scale) * self.scale)
-                                    )
-                                    for x, y in unified_polygon.exterior.coords
-                                ]
-                                pygame.draw.polygon(self.screen, entity.color, screen_points, 1)
-
-                            elif isinstance(unified_polygon, MultiPolygon):
-                                for polygon in unified_polygon.geoms:
-                                    screen_points = [
-                                        (
-                                            int((x - self.camera_center_x + self.screen_width / 2 / self.scale) * self.scale),
-                                            int((y - self.camera_center_y + self.screen_height / 2 / self.scale) * self.scale)
-                                        )
-                                        for x, y in polygon.exterior.coords
-                                    ]
-                                    pygame.draw.polygon(self.screen, entity.color, screen_points, 1)
-
-                            else:
-                                print("Aucun polygone valide pour l'entité.")
-                            
+        if self.is_overview():
+            # Fort dézoom : carte d'ensemble, sans générer les chunks qui ne sont pas encore chargés
+            blits.append(self.get_overview_surface(visible_chunks))
+        else:
+            for chunk in visible_chunks:
+                chunk_x, chunk_y = chunk
+                chunk = self.world.get_chunk(chunk_x, chunk_y)
                 
-                    # Afficher la zone visible par le PNJ
-                    if entity.vision_range > 0:
-                        # Affiche le cone de vision en fonction de l'angle de vue
-                        vision_polygon = entity.get_vision_polygon()
-                        if vision_polygon:
-                            # Obtenir les points du polygone
-                            points = list(vision_polygon.exterior.coords)
-                            # Ajouter les coordonnées du PNJ (centre du cône de vision)
-                            pnj_position = (entity.x, entity.y)
-                            
-                            # Convertir les points en coordonnées d'écran
-                            screen_points = [
-                                (
-                                    int((x - self.camera_center_x + self.screen_width / 2 / self.scale) * self.scale),
-                                    int((y - self.camera_center_y + self.screen_height / 2 / self.scale) * self.scale)
-                                )
-                                for x, y in points
-                            ]
-                            screen_points.pop(-1)
-                            screen_points.append((
-                                int((pnj_position[0] - self.camera_center_x + self.screen_width / 2 / self.scale) * self.scale),
-                                int((pnj_position[1] - self.camera_center_y + self.screen_height / 2 / self.scale) * self.scale)
-                            ))  
-                            # Créer une surface avec un canal alpha (transparence)
-                            transparent_surface = pygame.Surface((self.screen_width, self.screen_height), pygame.SRCALPHA)
-                            
-                            # Dessiner le polygone sur la surface transparente
-                            pygame.draw.polygon(transparent_surface, (255, 255, 0, 100), screen_points)
-                            
-                            # Blitter la surface transparente sur l'écran principal
-                            self.screen.blit(transparent_surface, (0, 0))
-                            
-                    # Afficher la cible du PNJ
-                    if entity.target_location:
-                        x, y = entity.target_location
-                        t_screen_x = int((x - self.camera_center_x + self.screen_width / 2 / self.scale) * self.scale)
-                        t_screen_y = int((y - self.camera_center_y + self.screen_height / 2 / self.scale) * self.scale)
-                        if entity.path:
-                            for i in range(len(entity.path) - 1):
-                                x1, y1 = entity.path[i]
-                                x2, y2 = entity.path[i + 1]
-                                p1 = (
-                                    int((x1 - self.camera_center_x + self.screen_width / 2 / self.scale) * self.scale),
-                                    int((y1 - self.camera_center_y + self.screen_height / 2 / self.scale) * self.scale)
-                                )
-                                p2 = (
-                                    int((x2 - self.camera_center_x + self.screen_width / 2 / self.scale) * self.scale),
-                                    int((y2 - self.camera_center_y + self.screen_height / 2 / self.scale) * self.scale)
-                                )
-                                if i == 0:
-                                    pygame.draw.line(self.screen, (100, 255, 0), (screen_x, screen_y), p1, 2)
-                                elif i == len(entity.path) - 2:
-                                    pygame.draw.line(self.screen, (100, 255, 0), p2, (t_screen_x, t_screen_y), 2)
-                                pygame.draw.line(self.screen, (100, 255, 0), p1, p2, 2)
-                        else:
-                            pygame.draw.line(self.screen, (100, 255, 0), (screen_x, screen_y), (t_screen_x, t_screen_y), 2)
-                        pygame.draw.circle(self.screen, (255, 0, 255), (t_screen_x, t_screen_y), self.scale // 2)
-                    
-                    if entity.path:
-                        for i in range(len(entity.path) - 1):
-                            x1, y1 = entity.path[i]
-                            x2, y2 = entity.path[i + 1]
-                            p1 = (
-                                int((x1 - self.camera_center_x + self.screen_width / 2 / self.scale) * self.scale),
-                                int((y1 - self.camera_center_y + self.screen_height / 2 / self.scale) * self.scale)
-                            )
-                            p2 = (
-                                int((x2 - self.camera_center_x + self.screen_width / 2 / self.scale) * self.scale),
-                                int((y2 - self.camera_center_y + self.screen_height / 2 / self.scale) * self.scale)
-                            )
-                            pygame.draw.line(self.screen, (100, 255, 0), p1, p2, 2)
+                # Chaque chunk est rendu une fois dans une surface, puis simplement copié dans le fond
+                screen_x = int(np.ceil((chunk_x * self.chunk_size - self.camera_center_x + self.screen_width / 2 / self.scale) * self.scale))
+                screen_y = int(np.ceil((chunk_y * self.chunk_size - self.camera_center_y + self.screen_height / 2 / self.scale) * self.scale))
+                blits.append((self.get_chunk_surface(chunk), (screen_x, screen_y)))
+            self.evict_chunk_surfaces(len(visible_chunks) + self.chunk_surface_margin)
+
+        # Le fond n'est recomposé que si la caméra a bougé ou si la surface d'un chunk visible a été refaite
+        terrain = [id(surface) for surface, _ in blits]
+        redraw_all = self.has_camera_moved() or terrain != self.terrain_surfaces
+        if redraw_all:
+            self.terrain_surfaces = terrain
+            self.background.fill((0, 0, 0))
+            self.background.blits(blits, doreturn=False)
+        begin = self.add_phase_time("terrain", begin)
+
+        self.draw_text("chunks", f"Chunks loaded: {snapshot.loaded_chunks}", (10, 40))
+        elements = self.get_scene_elements(snapshot.items, states)
+
+        if redraw_all:
+            dirty = [self.screen.get_rect()]
+        else:
+            # Zones des éléments modifiés : ancienne et nouvelle position
+            dirty = []
+            for key, (rect, signature, _) in elements.items():
+                previous = self.previous_elements.get(key)
+                if previous is None or previous[1] != signature:
+                    dirty.append(rect)
+                    if previous is not None:
+                        dirty.append(previous[0])
+            for key, (rect, _, _) in self.previous_elements.items():
+                if key not in elements:
+                    dirty.append(rect)
+            dirty = self.merge_rects([rect.clip(self.screen.get_rect()) for rect in dirty if rect.width and rect.height])
+        self.previous_elements = elements
+        self.add_phase_time("scene", begin)
+
+        for rect in dirty:
+            self.repaint(rect, elements)
+        return dirty
+
+    def add_phase_time(self, phase, begin):
+        """Ajoute le temps écoulé depuis `begin` à une phase du rendu (si les mesures sont actives) ; retourne l'instant courant."""
+        now = time.perf_counter()
+        if self.phase_times is not None:
+            self.phase_times[phase] = self.phase_times.get(phase, 0.0) + now - begin
+        return now
+
+    def get_scene_elements(self, items, states):
+        """Décrit tout ce qui est dessiné par-dessus le terrain : clé -> (rectangle, signature, dessin).
+
+        `items` et `states` viennent de l'instantané courant (voir SnapshotBuffer.interpolate).
+        L'ordre du dictionnaire est l'ordre de dessin ; la signature résume tout ce dont dépend le dessin.
+        Le dessin est une fonction, ou pour les items et les entités un couple (surface, position) : leurs
+        tampons pré-rendus (voir get_stamp) sont copiés par repaint en un seul appel à Surface.blits par
+        couche. Ordre des couches : items, surcouches des PNJ, entités, interface.
+        """
+        elements = {}
+        screen_rect = self.screen.get_rect()
+        # Tracés pré-rendus des chemins : seuls ceux encore affichés sont conservés
+        previous_paths, self.path_surfaces = self.path_surfaces, {}
+        if self.scale != self.stamps_scale:
+            # Changement de zoom : tous les tampons sont à refaire
+            self.stamps.clear()
+            self.stamps_scale = self.scale
+        
+        # Affichage des items droppés, hors de la vue écartés
+        size = int(self.scale * 0.5)
+        half = size // 2
+        for (key, _, item), (screen_x, screen_y) in zip(items, self.to_screen_array([position for _, position, _ in items])):
+            rect = pygame.Rect(screen_x - half, screen_y - half, 2 * half + 1, 2 * half + 1)
+            if not rect.colliderect(screen_rect):
+                continue
+            stamp_key = ("item", item.shape, item.color, size)
+            stamp = self.get_stamp(
+                stamp_key, half, lambda surface, item=item: draw_item(surface, half, half, size, item.color, item.shape))
+            elements[("item", key)] = (rect, (screen_x, screen_y, stamp_key), (stamp, rect.topleft))
         
-        # Ecriture du nombre de chunks chargés
-        text = self.font.render(f"Chunks loaded: {len(self.world.loaded_chunks)}", True, (255, 255, 255))
-        self.screen.blit(text, (10, 40))
+        # Afficher les PNJ : entités dans une couche à part, dessinée après les surcouches
+        bodies = {}
+        states = [(state, x, y) for state, x, y in states if state.is_visible]
+        for (state, x, y), (screen_x, screen_y) in zip(states, self.to_screen_array([(x, y) for _, x, y in states])):
+            size = int(state.size * self.scale)
+            half = size // 2
+            rect = pygame.Rect(screen_x - half, screen_y - half, 2 * half + 1, 2 * half + 1)
+            if rect.colliderect(screen_rect):
+                stamp_key = ("entity", state.shape, state.color, size, state.is_attacked)
+                red_filter = self.get_red_filter(size) if state.is_attacked else None
+                stamp = self.get_stamp(stamp_key, half, lambda surface, state=state, red_filter=red_filter: draw_entity(
+                    surface, state.color, size, half, half, state.shape, state.is_attacked, red_filter))
+                bodies[("entity", state.id)] = (rect, (screen_x, screen_y, stamp_key), (stamp, rect.topleft))
+
+            if state.entity_type != "PNJ":
+                continue
+            fog = state.fog
+            # Afficher la zone découverte par le PNJ
+            if self.show_discovered and fog is not None and fog.bounds:
+                left, top = self.to_screen(fog.bounds[0], fog.bounds[1])
+                right, bottom = self.to_screen(fog.bounds[2], fog.bounds[3])
+                rect = pygame.Rect(left - 1, top - 1, right - left + 3, bottom - top + 3)
+                elements[("discovered", state.id)] = (rect, (fog.version, state.color),
+                                                      lambda state=state: self.render_discovered_area(state.color, state.fog))
+
+            # Afficher la zone visible par le PNJ
+            if self.show_vision and state.vision_range > 0 and fog is not None and fog.visible is not None:
+                left, top = self.to_screen(*fog.visible_origin)
+                width, height = fog.visible.shape
+                rect = pygame.Rect(left, top, max(1, int(width * self.scale)), max(1, int(height * self.scale)))
+                elements[("visible", state.id)] = (rect, fog.visible_version,
+                                                   lambda fog=fog: self.render_visible_area(fog))
+
+            # Afficher la cible et le chemin du PNJ
+            if self.show_paths and (state.target_location or state.path):
+                points = [(screen_x, screen_y)] + [self.to_screen(px, py) for px, py in state.path]
+                if state.target_location:
+                    points.append(self.to_screen(*state.target_location))
+                margin = max(3, int(self.scale // 2) + 2)
+                xs, ys = [p[0] for p in points], [p[1] for p in points]
+                rect = pygame.Rect(min(xs) - margin, min(ys) - margin, max(xs) - min(xs) + 2 * margin + 1, max(ys) - min(ys) + 2 * margin + 1)
+                # Seule la partie du tracé à l'écran est pré-rendue : un long chemin à fort zoom dépasse largement l'écran
+                rect = rect.clip(screen_rect)
+                if rect.width and rect.height:
+                    signature = (tuple(points), self.scale)
+                    if state.id in previous_paths:
+                        self.path_surfaces[state.id] = previous_paths[state.id]
+                    draw = lambda key=state.id, rect=rect, signature=signature, state=state, x=x, y=y: self.screen.blit(
+                        self.get_path_surface(key, rect, signature, state, x, y), rect)
+                    elements[("path", state.id)] = (rect, tuple(points), draw)
+        elements.update(bodies)
+
+        # Interface : textes déposés par draw_text depuis le rendu précédent, en une seule surface
+        if self.hud:
+            signature, rect, layer = self.get_hud_layer()
+            elements[("hud", None)] = (rect, signature, lambda rect=rect, layer=layer: self.screen.blit(layer, rect))
+        # Les textes qui ne sont plus affichés perdent leur dernière valeur
+        self.hud_shown = {key: self.hud_shown[key] for key in self.hud}
+        self.hud = {}
+        return elements
+
+    def merge_rects(self, rects):
+        """Fusionne les rectangles qui se chevauchent, pour ne repeindre chaque zone qu'une fois."""
+        merged = []
+        for rect in rects:
+            index = rect.collidelist(merged)
+            while index != -1:
+                rect = rect.union(merged.pop(index))
+                index = rect.collidelist(merged)
+            merged.append(rect)
+        return merged
+
+    def repaint(self, rect, elements):
+        """Repeint une zone de l'écran : fond puis éléments qui la touchent, dans l'ordre, limités à la zone."""
+        self.screen.set_clip(rect)
+        begin = time.perf_counter()
+        self.screen.blit(self.background, rect, rect)
+        begin = self.add_phase_time("terrain", begin)
+        # Les tampons consécutifs d'une même couche sont copiés ensemble, en un seul appel
+        batch, batch_kind = [], None
+        for (kind, _), (element_rect, _, draw) in elements.items():
+            if not element_rect.colliderect(rect):
+                continue
+            if batch and (kind != batch_kind or callable(draw)):
+                self.screen.blits(batch, doreturn=False)
+                begin = self.add_phase_time(self.RENDER_PHASES[batch_kind], begin)
+                batch = []
+            if callable(draw):
+                draw()
+                begin = self.add_phase_time(self.RENDER_PHASES[kind], begin)
+            else:
+                batch.append(draw)
+                batch_kind = kind
+        if batch:
+            self.screen.blits(batch, doreturn=False)
+            self.add_phase_time(self.RENDER_PHASES[batch_kind], begin)
+        self.screen.set_clip(None)
+
+    def get_path_surface(self, key, rect, signature, entity, x, y):
+        """Retourne le tracé du chemin d'un PNJ pré-rendu dans une surface transparente de la taille de `rect`.
+
+        Les lignes obliques de pygame ne sont pas rastérisées pareil avec et sans zone de découpe : le
+        tracé est donc dessiné une fois dans sa surface puis copié, pour qu'une repeinte partielle donne les
+        mêmes pixels. `rect` est limité à l'écran ; la surface est réutilisée tant que sa taille ne change pas.
+        """
+        cached = self.path_surfaces.get(key)
+        if cached is None or cached[0] != signature:
+            if cached is not None and cached[1].get_size() == rect.size:
+                surface = cached[1]
+                surface.fill((0, 0, 0, 0))
+            else:
+                surface = pygame.Surface(rect.size, pygame.SRCALPHA)
+            self.render_path(entity, x, y, surface, rect.topleft)
+            cached = (signature, surface)
+        self.path_surfaces[key] = cached
+        return cached[1]
+
+    def render_path(self, entity, x, y, surface=None, origin=(0, 0)):
+        """Affiche le chemin et la cible d'un PNJ (ou de son état), depuis sa position affichée (x, y).
+
+        Par défaut le tracé est dessiné sur l'écran ; sinon sur `surface`, dont le coin haut gauche est à `origin`.
+        """
+        surface = self.screen if surface is None else surface
+        def to_surface(world_x, world_y):
+            screen_x, screen_y = self.to_screen(world_x, world_y)
+            return screen_x - origin[0], screen_y - origin[1]
+
+        screen_x, screen_y = to_surface(x, y)
+        if entity.target_location:
+            t_screen_x, t_screen_y = to_surface(*entity.target_location)
+            if entity.path:
+                for i in range(len(entity.path) - 1):
+                    p1 = to_surface(*entity.path[i])
+                    p2 = to_surface(*entity.path[i + 1])
+                    if i == 0:
+                        pygame.draw.line(surface, (100, 255, 0), (screen_x, screen_y), p1, 2)
+                    elif i == len(entity.path) - 2:
+                        pygame.draw.line(surface, (100, 255, 0), p2, (t_screen_x, t_screen_y), 2)
+                    pygame.draw.line(surface, (100, 255, 0), p1, p2, 2)
+            else:
+                pygame.draw.line(surface, (100, 255, 0), (screen_x, screen_y), (t_screen_x, t_screen_y), 2)
+            pygame.draw.circle(surface, (255, 0, 255), (t_screen_x, t_screen_y), self.scale // 2)
+
+        if entity.path:
+            for i in range(len(entity.path) - 1):
+                pygame.draw.line(surface, (100, 255, 0), to_surface(*entity.path[i]), to_surface(*entity.path[i + 1]), 2)
     
+    def render_discovered_area(self, color, fog):
+        """Affiche le contour des chunks découverts par un PNJ, tenu à jour par son brouillard de guerre."""
+        # Le contour est conservé en coordonnées monde : seule la transformation vers l'écran est faite ici
+        offset = np.array([self.screen_width / 2 / self.scale - self.camera_center_x,
+                           self.screen_height / 2 / self.scale - self.camera_center_y])
+        points = ((fog.edges + offset) * self.scale).astype(int).tolist()
+        for start, end in points:
+            pygame.draw.line(self.screen, color, start, end)
+
+    def render_visible_area(self, fog):
+        """Affiche les tuiles visibles par un PNJ au dernier tick, à partir de leur bitmap."""
+        visible, (x, y) = fog.visible, fog.visible_origin
+        if visible is None:
+            return
+        # Un pixel par tuile (jaune si visible, transparent sinon), agrandi à l'échelle de la caméra
+        pixels = np.zeros(visible.shape + (3,), dtype=np.uint8)
+        pixels[visible] = (255, 255, 0)
+        surface = pygame.surfarray.make_surface(pixels)
+        surface.set_colorkey((0, 0, 0))
+        surface.set_alpha(100)
+        width, height = visible.shape
+        surface = pygame.transform.scale(surface, (max(1, int(width * self.scale)), max(1, int(height * self.scale))))
+        screen_x = int((x - self.camera_center_x + self.screen_width / 2 / self.scale) * self.scale)
+        screen_y = int((y - self.camera_center_y + self.screen_height / 2 / self.scale) * self.scale)
+        self.screen.blit(surface, (screen_x, screen_y))
+
     def get_visible_tiles(self):
         """Récupère toutes les tuiles des chunks visibles avec leurs coordonnées globales."""
         half_screen_width = self.screen_width / 2  # Utiliser une division flottante
@@ -742,16 +1025,74 @@ class Camera:
             screen_height = self.scale
 
             # Déterminer la couleur en fonction du biome
-            color = (10, 10, 50)
-            for biome in self.config['biomes']:
-                if tile.biome == biome['name']:
-                    color = biome['color']
-                    break
+            color = self.get_biome_color(tile.biome)
 
             # Dessiner la tuile
             pygame.draw.rect(self.screen, color, pygame.Rect(screen_x, screen_y, screen_width, screen_height))
             pygame.draw.rect(self.screen, (100,100, 100), pygame.Rect(screen_x, screen_y, screen_width, screen_height), 1)
 
+    def get_chunk_surface(self, chunk):
+        """Retourne la surface pré-rendue du chunk à l'échelle courante, en la créant si nécessaire."""
+        if self.scale != self.chunk_surfaces_scale:
+            # Changement de zoom : toutes les surfaces sont à refaire
+            self.chunk_surfaces.clear()
+            self.chunk_surfaces_scale = self.scale
+        key = (chunk.x, chunk.y)
+        mesh = chunk.calculate_mesh(self.world.biomes)
+        cached = self.chunk_surfaces.get(key)
+        if cached is not None and cached[1] is mesh:
+            self.chunk_surfaces.move_to_end(key)
+            return cached[0]
+
+        # Le maillage est recalculé après une modification du chunk : la surface l'est aussi
+        size = int(np.ceil(self.chunk_size * self.scale))
+        surface = pygame.Surface((size, size)).convert()
+        surface.fill((10, 10, 50))
+        colors = self.world.biomes.colors
+        for x, y, w, h, biome_id in mesh:
+            left, top = int(np.ceil(x * self.scale)), int(np.ceil(y * self.scale))
+            right, bottom = int(np.ceil((x + w) * self.scale)), int(np.ceil((y + h) * self.scale))
+            surface.fill(colors[biome_id], pygame.Rect(left, top, right - left + 1, bottom - top + 1))
+        self.chunk_surfaces[key] = (surface, mesh)
+        self.chunk_surfaces.move_to_end(key)
+        return surface
+
+    def is_overview(self):
+        """Indique si le terrain est rendu depuis la carte d'ensemble (fort dézoom)."""
+        return self.scale < self.overview_scale
+
+    def get_overview_surface(self, visible_chunks):
+        """Retourne (surface, position) de la carte d'ensemble couvrant les chunks visibles.
+
+        La surface est conservée tant que la zone couverte, le zoom et la carte d'ensemble ne changent pas.
+        """
+        xs, ys = [coords[0] for coords in visible_chunks], [coords[1] for coords in visible_chunks]
+        left, top, right, bottom = min(xs), min(ys), max(xs), max(ys)
+        overview = self.world.overview
+        resolution = overview.get_resolution(self.chunk_size * self.scale)
+        area = (left, top, right, bottom, resolution, self.scale, len(self.world.loaded_chunks))
+        if self.overview_surface is None or self.overview_surface[0] != area + (overview.version,):
+            center = (self.camera_center_x / self.chunk_size, self.camera_center_y / self.chunk_size)
+            grid, remaining = overview.build(left, top, right, bottom, resolution, center)
+            # Un pixel par case de la grille, agrandi à l'échelle de la caméra
+            surface = pygame.surfarray.make_surface(self.world.biomes.color_table[grid])
+            size = (int(np.ceil((right - left + 1) * self.chunk_size * self.scale)), int(np.ceil((bottom - top + 1) * self.chunk_size * self.scale)))
+            surface = pygame.transform.scale(surface, size).convert()
+            # Tant que des chunks restent à échantillonner, la carte est refaite à l'image suivante
+            self.overview_surface = (area + (overview.version,) if not remaining else None, surface)
+        screen_x = int(np.ceil((left * self.chunk_size - self.camera_center_x + self.screen_width / 2 / self.scale) * self.scale))
+        screen_y = int(np.ceil((top * self.chunk_size - self.camera_center_y + self.screen_height / 2 / self.scale) * self.scale))
+        return self.overview_surface[1], (screen_x, screen_y)
+
+    def evict_chunk_surfaces(self, capacity):
+        """Retire les surfaces les moins récemment affichées au-delà de la capacité."""
+        while len(self.chunk_surfaces) > capacity:
+            self.chunk_surfaces.popitem(last=False)
+
+    def get_biome_color(self, tile_type):
+        """Retourne la couleur d'un biome."""
+        return self.world.biomes.get_color(tile_type)
+
     def render_rectangles(self, rectangles):
         """Rend les rectangles optimisés."""
         for rect in rectangles:
@@ -770,11 +1111,7 @@ class Camera:
             screen_height = int(np.ceil(screen_height))
 
             # Déterminer la couleur en fonction du biome
-            color = (10, 10, 50)
-            for biome in self.config['biomes']:
-                if tile_type == biome['name']:
-                    color = biome['color']
-                    break
+            color = self.get_biome_color(tile_type)
 
             # Dessiner le rectangle sans marge ajoutée
             
@@ -0,0 +1,101 @@
+import threading
+import numpy as np
+
+NEEDS = ('hunger', 'thirst', 'energy')  # Colonnes de la matrice des besoins
+DECAY_RATES = (0.3, 0.4, 0.05)  # Diminution par seconde de chaque besoin
+TRACKED_RESOURCES = ('Water',)  # Ressources connues prises en compte par les utilités
+ACTIONS = ('drink', 'eat', 'explore')  # Actions candidates, dans l'ordre de priorité en cas d'égalité
+
+class NeedsView:
+    """Accès aux besoins d'un PNJ comme à un dictionnaire, adossé à une ligne de la matrice partagée."""
+    def __init__(self, matrix, slot):
+        self.matrix = matrix
+        self.slot = slot
+
+    def __getitem__(self, need):
+        return float(self.matrix.values[self.slot, NEEDS.index(need)])
+
+    def __setitem__(self, need, value):
+        self.matrix.values[self.slot, NEEDS.index(need)] = value
+
+    def keys(self):
+        return list(NEEDS)
+
+    def items(self):
+        return [(need, self[need]) for need in NEEDS]
+
+    def __iter__(self):
+        return iter(NEEDS)
+
+    def __repr__(self):
+        return repr(dict(self.items()))
+
+class NeedsMatrix:
+    """Besoins de tous les PNJ dans une matrice NumPy (une ligne par PNJ), mis à jour en un seul calcul par tick."""
+    def __init__(self, capacity=64):
+        self.values = np.zeros((capacity, len(NEEDS)))
+        self.known = np.zeros((capacity, len(TRACKED_RESOURCES)), dtype=bool)  # Ressources connues par PNJ
+        self.active = np.zeros(capacity, dtype=bool)
+        self.best = np.full(capacity, -1)  # Meilleure action au tick précédent
+        self.owners = [None] * capacity
+        self.free = list(range(capacity - 1, -1, -1))
+        self.decay_rates = np.array(DECAY_RATES)
+        self.lock = threading.Lock()
+
+    def allocate(self, pnj, initial=100):
+        """Réserve une ligne pour le PNJ et retourne la vue de ses besoins."""
+        with self.lock:
+            if not self.free:
+                self.grow()
+            slot = self.free.pop()
+            self.values[slot] = initial
+            self.known[slot] = False
+            self.best[slot] = -1
+            self.active[slot] = True
+            self.owners[slot] = pnj
+        return NeedsView(self, slot)
+
+    def grow(self):
+        """Double la capacité de la matrice."""
+        capacity = len(self.values)
+        self.values = np.concatenate([self.values, np.zeros_like(self.values)])
+        self.known = np.concatenate([self.known, np.zeros_like(self.known)])
+        self.active = np.concatenate([self.active, np.zeros_like(self.active)])
+        self.best = np.concatenate([self.best, np.full(capacity, -1)])
+        self.owners.extend([None] * capacity)
+        self.free.extend(range(2 * capacity - 1, capacity - 1, -1))
+
+    def release(self, pnj):
+        """Libère la ligne d'un PNJ retiré du monde (sans effet pour les autres entités)."""
+        with self.lock:
+            for slot, owner in enumerate(self.owners):
+                if owner is pnj:
+                    self.active[slot] = False
+                    self.owners[slot] = None
+                    self.free.append(slot)
+                    return
+
+    def set_known(self, slot, resource, known=True):
+        """Indique si le PNJ connaît une ressource suivie par les utilités."""
+        if resource in TRACKED_RESOURCES:
+            self.known[slot, TRACKED_RESOURCES.index(resource)] = known
+
+    def utilities(self):
+        """Calcule le score de chaque action pour tous les PNJ : matrice (capacité, nombre d'actions).
+
+        Les seuils reprennent ceux du comportement d'origine : boire si la soif passe sous 40 et qu'une
+        eau est connue, manger si la faim passe sous 30, explorer sinon.
+        """
+        hunger, thirst = self.values[:, 0], self.values[:, 1]
+        drink = (thirst < 40) & self.known[:, TRACKED_RESOURCES.index('Water')]
+        eat = hunger < 30
+        return np.stack([drink * 3.0, eat * 2.0, np.ones(len(self.values))], axis=1)
+
+    def update(self, delta_time):
+        """Diminue tous les besoins d'un pas et retourne les (PNJ, action) dont la meilleure action a changé."""
+        with self.lock:
+            self.values[self.active] -= self.decay_rates * delta_time
+            best = np.argmax(self.utilities(), axis=1)
+            changed = np.flatnonzero(self.active & (best != self.best))
+            self.best = best
+            return [(self.owners[slot], ACTIONS[best[slot]]) for slot in changed]
@@ -0,0 +1,113 @@
+import math
+import numpy as np
+from chunk_ import biome_from_noise
+from biomes import UNKNOWN_BIOME
+
+class OverviewMap:
+    """Carte d'ensemble multi-résolution du monde, pour l'affichage à fort dézoom sans générer de chunks.
+
+    Pour un chunk chargé, la carte conserve une pyramide de résumés de ses biomes (résolutions en
+    puissances de 2 jusqu'à chunk_size), obtenus par biome majoritaire de chaque bloc ; si chunk_size
+    n'est pas une puissance de 2, les blocs diffèrent d'au plus une tuile. Au-delà de la zone
+    chargée, le bruit de Perlin est échantillonné sur une grille grossière (noise_resolution x
+    noise_resolution points par chunk), avec un budget d'échantillons par appel.
+    """
+    def __init__(self, world, noise_resolution=4, samples_per_frame=512):
+        self.world = world
+        self.biomes = world.biomes
+        self.chunk_size = world.config['chunk_size']
+        self.transition_zone = world.config.get('transition_zone', 0.2)
+        self.noise_resolution = min(noise_resolution, self.chunk_size)
+        self.samples_per_frame = samples_per_frame  # Nombre maximal d'appels au bruit par image
+        self.summaries = {}  # (chunk_x, chunk_y) -> (grille d'identifiants source, {résolution: grille résumée})
+        self.samples = {}  # (chunk_x, chunk_y) -> grille grossière d'identifiants échantillonnée dans le bruit
+        self.version = 0  # Incrémentée à chaque nouveau résumé ou échantillonnage
+
+    def get_resolution(self, pixels_per_chunk):
+        """Retourne la résolution (puissance de 2, au plus chunk_size) adaptée à la taille d'un chunk à l'écran."""
+        resolution = 1
+        while resolution * 2 <= min(self.chunk_size, pixels_per_chunk):
+            resolution *= 2
+        return resolution
+
+    def downsample(self, ids, resolution):
+        """Réduit une grille carrée d'identifiants à resolution x resolution, par biome majoritaire de chaque bloc."""
+        size = len(ids)
+        if size == resolution:
+            return ids
+        # Début de chaque bloc : la tuile i appartient au bloc i * resolution // size
+        starts = -(-np.arange(resolution) * size // resolution)
+        counts = (ids[..., None] == np.arange(len(self.biomes.names))).astype(np.int32)
+        counts = np.add.reduceat(np.add.reduceat(counts, starts, axis=0), starts, axis=1)
+        return counts.argmax(axis=2).astype(ids.dtype)
+
+    def get_summary(self, chunk, resolution):
+        """Retourne le résumé d'un chunk chargé à la résolution demandée, recalculé si ses tuiles ont changé."""
+        source = self.biomes.get_chunk_ids(chunk)
+        key = (chunk.x, chunk.y)
+        entry = self.summaries.get(key)
+        if entry is None or entry[0] is not source:
+            entry = self.summaries[key] = (source, {})
+            self.samples.pop(key, None)
+        levels = entry[1]
+        if resolution not in levels:
+            levels[resolution] = self.downsample(source, resolution)
+            self.version += 1
+        return levels[resolution]
+
+    def sample_chunk(self, chunk_x, chunk_y):
+        """Échantillonne le bruit au centre de chaque bloc d'un chunk non chargé ; retourne la grille grossière."""
+        resolution = self.noise_resolution
+        noise = self.world.noise_generator
+        names = self.world.config['biomes']
+        ids = np.empty((resolution, resolution), dtype=np.uint8)
+        for i in range(resolution):
+            for j in range(resolution):
+                x = chunk_x * self.chunk_size + (2 * i + 1) * self.chunk_size // (2 * resolution)
+                y = chunk_y * self.chunk_size + (2 * j + 1) * self.chunk_size // (2 * resolution)
+                value = noise.get_noise(x, y, self.chunk_size)
+                ids[i, j] = self.biomes.get_id(biome_from_noise(names, self.transition_zone, value))
+        self.samples[(chunk_x, chunk_y)] = ids
+        self.version += 1
+        return ids
+
+    def build(self, left, top, right, bottom, resolution, center=None):
+        """Assemble la grille d'identifiants des chunks [left, right] x [top, bottom], à `resolution` cases par chunk.
+
+        Les chunks chargés utilisent leur résumé ; les autres leur échantillonnage, réalisé dans la limite
+        du budget en partant du centre (x, y) en chunks ; les chunks pas encore échantillonnés restent inconnus.
+        Retourne la grille et le nombre de chunks restant à échantillonner.
+        """
+        width, height = right - left + 1, bottom - top + 1
+        grid = np.full((width * resolution, height * resolution), UNKNOWN_BIOME, dtype=np.uint8)
+        missing = []
+        for chunk_x in range(left, right + 1):
+            for chunk_y in range(top, bottom + 1):
+                chunk = self.world.loaded_chunks.get((chunk_x, chunk_y))
+                if chunk is not None and chunk.tiles is not None:
+                    ids = self.get_summary(chunk, resolution)
+                else:
+                    ids = self.samples.get((chunk_x, chunk_y))
+                    if ids is None:
+                        missing.append((chunk_x, chunk_y))
+                        continue
+                self.paste(grid, ids, (chunk_x - left) * resolution, (chunk_y - top) * resolution, resolution)
+
+        # Échantillonnage progressif des chunks manquants, les plus proches du centre d'abord
+        if center is not None:
+            missing.sort(key=lambda coords: math.hypot(coords[0] - center[0], coords[1] - center[1]))
+        budget = max(1, self.samples_per_frame // (self.noise_resolution ** 2))
+        for chunk_x, chunk_y in missing[:budget]:
+            ids = self.sample_chunk(chunk_x, chunk_y)
+            self.paste(grid, ids, (chunk_x - left) * resolution, (chunk_y - top) * resolution, resolution)
+        return grid, max(0, len(missing) - budget)
+
+    def paste(self, grid, ids, x, y, resolution):
+        """Copie une grille de chunk dans la grille assemblée, en l'agrandissant ou la réduisant à `resolution`."""
+        size = len(ids)
+        if size < resolution:
+            index = np.arange(resolution) * size // resolution
+            ids = ids[np.ix_(index, index)]
+        elif size > resolution:
+            ids = self.downsample(ids, resolution)
+        grid[x:x + resolution, y:y + resolution] = ids
@@ -0,0 +1,118 @@
+import queue, threading
+from concurrent.futures import ThreadPoolExecutor
+from entity import Pathfinding
+
+class TerrainSnapshot:
+    """Vue en lecture seule des chunks chargés, utilisée par les workers de pathfinding."""
+    def __init__(self, world):
+        self.config = world.config
+        self.chunk_size = world.config['chunk_size']
+        self.biomes = world.biomes
+        # Copie superficielle : les chunks générés après la capture n'y apparaissent pas
+        self.chunks = dict(world.loaded_chunks)
+
+    def get_chunk(self, chunk_x, chunk_y):
+        """Retourne le chunk s'il faisait partie des chunks chargés lors de la capture, None sinon."""
+        return self.chunks.get((chunk_x, chunk_y))
+
+    def get_tile_at(self, x, y):
+        """Retourne la tuile aux coordonnées globales (x, y), ou None si le chunk n'est pas chargé."""
+        chunk = self.chunks.get((int(x) // self.chunk_size, int(y) // self.chunk_size))
+        if chunk is None:
+            return None
+        return chunk.tiles[int(x) % self.chunk_size][int(y) % self.chunk_size]
+
+class PathRequest:
+    """Requête de chemin en attente pour une entité."""
+    def __init__(self, entity_id, start, goal, vision_range, callback, max_iterations=2500):
+        self.entity_id = entity_id
+        self.start = start
+        self.goal = goal
+        self.vision_range = vision_range
+        self.callback = callback  # Appelée avec le chemin depuis le thread des entités
+        self.max_iterations = max_iterations
+        self.cancelled = False
+
+class PathRequestService:
+    """File de requêtes A* résolues par un pool de threads sur un instantané du terrain."""
+    def __init__(self, world, max_workers=2, deterministic=False):
+        self.world = world
+        self.deterministic = deterministic  # Résolution immédiate dans le thread appelant (rejeu reproductible)
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="pathfinding")
+        self.pending = {}  # Requête en cours par identifiant d'entité
+        self.results = queue.Queue()  # Chemins calculés en attente de livraison
+        self.lock = threading.Lock()
+        self.snapshot = None
+        self.snapshot_size = -1
+        self.visibility_cache = {}  # Partagé par les workers entre deux recalculs
+
+    def invalidate_terrain(self):
+        """Oublie les segments mémorisés après une modification du terrain."""
+        self.visibility_cache.clear()
+
+    def get_snapshot(self):
+        """Retourne l'instantané du terrain, recréé uniquement si de nouveaux chunks ont été chargés."""
+        loaded = len(self.world.loaded_chunks)
+        if self.snapshot is None or loaded != self.snapshot_size:
+            self.snapshot = TerrainSnapshot(self.world)
+            self.snapshot_size = loaded
+        return self.snapshot
+
+    def request_path(self, entity, start, goal, vision_range, callback, max_iterations=2500):
+        """Met en file une requête de chemin ; remplace la requête précédente de l'entité."""
+        request = PathRequest(entity.id, start, goal, vision_range, callback, max_iterations)
+        with self.lock:
+            previous = self.pending.get(entity.id)
+            if previous:
+                previous.cancelled = True
+            self.pending[entity.id] = request
+        if self.deterministic:
+            # Le chemin est calculé tout de suite mais livré, comme en mode asynchrone, au prochain dispatch
+            self.solve(request, self.get_snapshot())
+        else:
+            self.executor.submit(self.solve, request, self.get_snapshot())
+        return request
+
+    def is_pending(self, entity):
+        """Retourne True si une requête de l'entité est en cours de calcul."""
+        return entity.id in self.pending
+
+    def cancel(self, entity):
+        """Annule la requête en cours de l'entité, si elle existe."""
+        with self.lock:
+            request = self.pending.pop(entity.id, None)
+        if request:
+            request.cancelled = True
+
+    def solve(self, request, snapshot):
+        """Résout une requête sur un thread du pool."""
+        if request.cancelled:
+            return
+        pathfinder = Pathfinding(snapshot, self.visibility_cache)
+        try:
+            path = pathfinder.a_star(request.start, request.goal, request.vision_range, request.max_iterations,
+                                     lambda path: self.results.put((request, path)))
+        except Exception as e:
+            print(f"Erreur de pathfinding pour {request.entity_id} : {e}")
+            path = []
+        if not path:
+            self.results.put((request, []))
+
+    def dispatch_results(self):
+        """Livre les chemins calculés via leur callback ; à appeler depuis le thread des entités."""
+        while True:
+            try:
+                request, path = self.results.get_nowait()
+            except queue.Empty:
+                break
+            with self.lock:
+                # Ignorer les résultats des requêtes remplacées ou déjà livrées
+                if self.pending.get(request.entity_id) is not request:
+                    continue
+                del self.pending[request.entity_id]
+            if not request.cancelled:
+                request.callback(path)
+
+    def shutdown(self):
+        """Arrête le pool de workers sans attendre les requêtes en cours."""
+        self.executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,210 @@
+"""
+Enregistrement et rejeu déterministe d'une partie, pour comparer les temps de tick entre deux commits.
+
+Une partie enregistrée contient la graine du monde, la configuration, l'ordre des chunks chargés au départ,
+puis, pour chaque pas de simulation, l'état de la caméra (quand il change), les apparitions d'entités et,
+à intervalle régulier, une empreinte de l'état des entités. Le rejeu exécute la même séquence sans affichage
+et signale la première divergence éventuelle.
+
+Exemples :
+    python SimuProximaB.py --record partie.rec.gz
+    python replay.py partie.rec.gz --output replay.json
+    python replay.py partie.rec.gz --compare replay.json --threshold 0.2
+"""
+import argparse, contextlib, gzip, hashlib, io, json, os, statistics, subprocess, sys, tempfile, time
+
+FORMAT_VERSION = 1
+
+def state_digest(world):
+    """Empreinte courte de la position et de la santé de toutes les entités."""
+    digest = hashlib.blake2b(digest_size=8)
+    for entity_type, entities in world.entities.items():
+        for entity in entities:
+            digest.update(f"{entity_type}:{entity.x:.4f}:{entity.y:.4f}:{entity.health}".encode())
+    return digest.hexdigest()
+
+class Recorder:
+    """Écrit une partie sous forme de lignes JSON compactes dans un fichier gzip."""
+    def __init__(self, path, hash_interval=20):
+        self.path = path
+        self.hash_interval = hash_interval  # Nombre de pas entre deux empreintes de l'état
+        self.file = None
+        self.last_camera = None
+
+    def write(self, record):
+        self.file.write(json.dumps(record, separators=(',', ':')) + "\n")
+
+    def start(self, world, simulation):
+        """Écrit l'en-tête ; à appeler après la création du monde et avant l'apparition des premières entités."""
+        self.file = gzip.open(self.path, 'wt')
+        self.write({
+            "version": FORMAT_VERSION,
+            "seed": world.seed,
+            "config": world.config,
+            "chunks": [list(coords) for coords in world.loaded_chunks],
+            "entity_delta_time": simulation.entity_delta_time,
+            "chunk_update_interval": simulation.chunk_update_interval,
+            "hash_interval": self.hash_interval,
+        })
+
+    def record_spawn(self, entity):
+        """Enregistre l'apparition d'une entité (appelée par World.add_entity)."""
+        if self.file:
+            self.write(["s", entity.entity_type, round(entity.x, 4), round(entity.y, 4)])
+
+    def record_tick(self, simulation):
+        """Marque le début d'un pas de simulation, avec l'état de la caméra s'il a changé."""
+        if simulation.tick % self.hash_interval == 0:
+            self.write(["h", simulation.tick, state_digest(simulation.world)])
+        camera = simulation.camera
+        state = [camera.camera_center_x, camera.camera_center_y, camera.scale]
+        if state != self.last_camera:
+            self.last_camera = state
+            self.write(["t"] + state)
+        else:
+            self.write(["t"])
+
+    def close(self):
+        if self.file:
+            self.file.close()
+            self.file = None
+
+def load_recording(path):
+    """Retourne l'en-tête et la liste des enregistrements d'une partie."""
+    with gzip.open(path, 'rt') as f:
+        header = json.loads(f.readline())
+        if header.get("version") != FORMAT_VERSION:
+            raise ValueError(f"Version d'enregistrement non prise en charge : {header.get('version')}")
+        return header, [json.loads(line) for line in f]
+
+class ReplayChecker:
+    """Compare les apparitions d'entités du rejeu à celles de l'enregistrement."""
+    def __init__(self, records):
+        self.expected = [record[1:] for record in records if record[0] == "s"]
+        self.index = 0
+        self.tick = 0
+        self.divergence = None  # (tick, description) de la première divergence
+
+    def diverge(self, description):
+        if self.divergence is None:
+            self.divergence = (self.tick, description)
+
+    def record_spawn(self, entity):
+        actual = [entity.entity_type, round(entity.x, 4), round(entity.y, 4)]
+        expected = self.expected[self.index] if self.index < len(self.expected) else None
+        self.index += 1
+        if actual != expected:
+            self.diverge(f"apparition {actual} au lieu de {expected}")
+
+def replay(path):
+    """Rejoue une partie sans affichage ; retourne les durées des pas (ms) et la divergence éventuelle."""
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    import pygame
+    from moteurGraphique import World, Camera
+    from event import EventManager
+    from SimuProximaB import Simulation
+
+    header, records = load_recording(path)
+    checker = ReplayChecker(records)
+    pygame.init()
+    with tempfile.TemporaryDirectory() as directory:
+        world = World(header["config"], event_manager=EventManager(), seed=header["seed"], deterministic=True,
+                      recorder=checker, chunk_file=os.path.join(directory, "chunks.json"))
+        # Reproduire l'ordre des chunks chargés au départ de la partie enregistrée
+        order = [tuple(coords) for coords in header["chunks"]]
+        for coords in order:
+            world.get_chunk(*coords)
+        world.loaded_chunks = {**{coords: world.loaded_chunks[coords] for coords in order}, **world.loaded_chunks}
+        world.flow_fields.pending.clear()
+
+        camera = Camera(world, header["config"], mode="free")
+        simulation = Simulation(world, camera)
+        simulation.entity_delta_time = header["entity_delta_time"]
+        simulation.chunk_update_interval = header["chunk_update_interval"]
+        simulation.initialize_simulation()
+
+        durations = []
+        for record in records:
+            kind = record[0]
+            if kind == "h":
+                if record[2] != state_digest(world):
+                    checker.diverge("empreinte de l'état différente")
+            elif kind == "t":
+                if len(record) > 1:
+                    camera.camera_center_x, camera.camera_center_y, camera.scale = record[1:]
+                begin = time.perf_counter()
+                simulation.step()
+                durations.append((time.perf_counter() - begin) * 1000)
+                # Chunks chargés par le rendu de la caméra après le pas, comme pendant l'enregistrement
+                # (la carte d'ensemble affichée à fort dézoom n'en charge aucun)
+                if not camera.is_overview():
+                    for chunk_x, chunk_y in camera.get_visible_chunks():
+                        world.get_chunk(chunk_x, chunk_y)
+                checker.tick = simulation.tick
+        world.path_service.shutdown()
+    pygame.quit()
+    if checker.index != len(checker.expected):
+        checker.diverge(f"{checker.index} apparitions au lieu de {len(checker.expected)}")
+    return durations, checker.divergence
+
+def summarize(durations):
+    """Agrège les durées des pas de simulation."""
+    ordered = sorted(durations)
+    return {
+        "ticks": len(durations),
+        "tick_ms_mean": statistics.mean(durations) if durations else 0.0,
+        "tick_ms_median": statistics.median(durations) if durations else 0.0,
+        "tick_ms_p95": ordered[int(0.95 * (len(ordered) - 1))] if ordered else 0.0,
+        "tick_ms_max": ordered[-1] if ordered else 0.0,
+        "total_s": sum(durations) / 1000,
+    }
+
+def current_commit():
+    """Retourne le commit courant, si le rejeu est lancé depuis le dépôt git."""
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], stderr=subprocess.DEVNULL, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def compare(summary, baseline, threshold):
+    """Affiche les écarts avec un rejeu de référence ; retourne False en cas de régression."""
+    ok = True
+    for metric in ("tick_ms_mean", "tick_ms_median", "tick_ms_p95"):
+        old, new = baseline["summary"][metric], summary[metric]
+        delta = (new - old) / old if old else 0.0
+        regression = delta > threshold
+        ok = ok and not regression
+        flag = "  REGRESSION" if regression else ""
+        print(f"{metric:16s} {old:10.3f} -> {new:10.3f} ({delta:+.1%}){flag}")
+    return ok
+
+def main():
+    parser = argparse.ArgumentParser(description="Rejeu déterministe d'une partie enregistrée.")
+    parser.add_argument("recording", help="Fichier d'enregistrement (SimuProximaB.py --record)")
+    parser.add_argument("--output", help="Fichier JSON où écrire les résultats")
+    parser.add_argument("--compare", help="Fichier JSON de référence à comparer")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Régression relative tolérée")
+    args = parser.parse_args()
+
+    with contextlib.redirect_stdout(io.StringIO()):  # Les entités commentent leurs actions
+        durations, divergence = replay(args.recording)
+    summary = summarize(durations)
+    print(f"{summary['ticks']} pas, moyenne={summary['tick_ms_mean']:.3f} ms médiane={summary['tick_ms_median']:.3f} ms "
+          f"p95={summary['tick_ms_p95']:.3f} ms max={summary['tick_ms_max']:.3f} ms")
+    if divergence:
+        print(f"Divergence au pas {divergence[0]} : {divergence[1]}")
+
+    results = {"commit": current_commit(), "recording": args.recording, "summary": summary,
+               "divergence": divergence, "ticks_ms": durations}
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+    if args.compare:
+        with open(args.compare, 'r') as f:
+            baseline = json.load(f)
+        if not compare(summary, baseline, args.threshold):
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
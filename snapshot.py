@@ -0,0 +1,139 @@
+import collections, threading, time
+from types import MappingProxyType
+
+class FogState:
+    """État immuable du brouillard de guerre d'un PNJ : contour découvert et tuiles visibles."""
+    __slots__ = ('version', 'edges', 'bounds', 'visible', 'visible_origin', 'visible_version')
+
+    def __init__(self, fog, previous=None):
+        # Le contour n'est copié qu'après une découverte ; le bitmap visible est remplacé, jamais modifié
+        same_area = previous is not None and previous.version == fog.version
+        object.__setattr__(self, 'version', fog.version)
+        object.__setattr__(self, 'edges', previous.edges if same_area else fog.get_edges().copy())
+        object.__setattr__(self, 'bounds', fog.get_bounds())
+        object.__setattr__(self, 'visible', fog.visible)
+        object.__setattr__(self, 'visible_origin', fog.visible_origin)
+        object.__setattr__(self, 'visible_version', fog.visible_version)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("L'état d'un brouillard de guerre est immuable.")
+
+class EntityState:
+    """État immuable d'une entité à la fin d'un tick : tout ce dont le rendu a besoin."""
+    __slots__ = ('entity', 'id', 'entity_type', 'x', 'y', 'size', 'color', 'shape', 'is_attacked', 'is_visible',
+                 'vision_range', 'path', 'target_location', 'fog')
+
+    def __init__(self, entity, fog=None):
+        path = getattr(entity, 'path', None)
+        target = getattr(entity, 'target_location', None)
+        object.__setattr__(self, 'entity', entity)  # Identité seulement (suivi par la caméra, survol) ; jamais lue au rendu
+        object.__setattr__(self, 'id', entity.id)
+        object.__setattr__(self, 'entity_type', entity.entity_type)
+        object.__setattr__(self, 'x', float(entity.x))
+        object.__setattr__(self, 'y', float(entity.y))
+        object.__setattr__(self, 'size', entity.size)
+        object.__setattr__(self, 'color', tuple(entity.color))
+        object.__setattr__(self, 'shape', getattr(entity, 'shape', 'circle'))
+        object.__setattr__(self, 'is_attacked', entity.is_attacked)
+        object.__setattr__(self, 'is_visible', getattr(entity, 'is_alive', True))
+        object.__setattr__(self, 'vision_range', getattr(entity, 'vision_range', 0))
+        object.__setattr__(self, 'path', tuple(tuple(point) for point in path) if path else ())
+        object.__setattr__(self, 'target_location', tuple(target) if target else None)
+        object.__setattr__(self, 'fog', fog)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("L'état d'une entité est immuable.")
+
+class WorldSnapshot:
+    """Instantané immuable du monde publié à la fin d'un tick de simulation."""
+    __slots__ = ('tick', 'time', 'entities', 'by_id', 'items', 'loaded_chunks')
+
+    def __init__(self, tick, timestamp, entities, items, loaded_chunks):
+        object.__setattr__(self, 'tick', tick)
+        object.__setattr__(self, 'time', timestamp)
+        object.__setattr__(self, 'entities', tuple(entities))
+        object.__setattr__(self, 'by_id', MappingProxyType({state.id: state for state in entities}))
+        object.__setattr__(self, 'items', tuple(items))  # (clé, position, item) des objets au sol
+        object.__setattr__(self, 'loaded_chunks', loaded_chunks)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Un instantané du monde est immuable.")
+
+class SnapshotBuffer:
+    """Tampon circulaire (triple) des derniers instantanés du monde, partagé entre simulation et rendu.
+
+    Le thread des entités publie un instantané par tick ; le thread de rendu ne lit que les deux derniers
+    et interpole les positions entre eux, sans jamais toucher aux entités vivantes.
+    """
+    def __init__(self, size=3):
+        self.snapshots = collections.deque(maxlen=size)
+        self.lock = threading.Lock()
+        self.fog_states = {}  # Identifiant de PNJ -> dernier FogState, réutilisé tant que le brouillard ne change pas
+        self.tick = 0
+
+    def capture(self, world):
+        """Construit l'instantané du monde (thread des entités, en fin de tick) et le publie."""
+        states = []
+        fog_states = {}
+        for entity_list in list(world.entities.values()):
+            for entity in list(entity_list):
+                fog = None
+                memory = getattr(entity, 'memory', None)
+                if memory is not None:
+                    previous = self.fog_states.get(entity.id)
+                    if previous is not None and previous.version == memory.fog.version and previous.visible_version == memory.fog.visible_version:
+                        fog = previous
+                    else:
+                        fog = FogState(memory.fog, previous)
+                    fog_states[entity.id] = fog
+                states.append(EntityState(entity, fog))
+        self.fog_states = fog_states
+
+        items = []
+        for chunk in list(world.loaded_chunks.values()):
+            for dropped_item in chunk.dropped_items:
+                items.append((id(dropped_item), tuple(dropped_item.position), dropped_item.item))
+
+        self.tick += 1
+        self.publish(WorldSnapshot(self.tick, time.perf_counter(), states, items, len(world.loaded_chunks)))
+
+    def publish(self, snapshot):
+        with self.lock:
+            self.snapshots.append(snapshot)
+
+    def latest(self):
+        """Retourne les deux derniers instantanés (précédent, courant) ; chacun peut valoir None."""
+        with self.lock:
+            if not self.snapshots:
+                return None, None
+            previous = self.snapshots[-2] if len(self.snapshots) > 1 else None
+            return previous, self.snapshots[-1]
+
+    def interpolate(self, now=None):
+        """Retourne (instantané courant, [(état, x, y)]) avec les positions interpolées entre les deux derniers ticks.
+
+        Le rendu a un tick de retard : il parcourt le trajet du tick précédent au tick courant pendant
+        l'intervalle qui suit la publication du tick courant.
+        """
+        previous, current = self.latest()
+        if current is None:
+            return None, []
+        if previous is None or current.time <= previous.time:
+            return current, [(state, state.x, state.y) for state in current.entities]
+        now = time.perf_counter() if now is None else now
+        alpha = min(1.0, max(0.0, (now - current.time) / (current.time - previous.time)))
+        positions = []
+        for state in current.entities:
+            before = previous.by_id.get(state.id)
+            if before is None:
+                positions.append((state, state.x, state.y))
+            else:
+                positions.append((state, before.x + (state.x - before.x) * alpha, before.y + (state.y - before.y) * alpha))
+        return current, positions
+
+    def position(self, entity_id, now=None):
+        """Retourne la position interpolée d'une entité, ou None si elle ne figure pas dans le dernier instantané."""
+        for state, x, y in self.interpolate(now)[1]:
+            if state.id == entity_id:
+                return x, y
+        return None
@@ -1,3 +1,5 @@
+import heapq, itertools
+
 class Task:
     """Représente une tâche générique pour toute entité."""
     def __init__(self, name, action, priority, energy_cost, *args, **kwargs):
@@ -36,27 +38,87 @@ class Task:
         self.completed = True
 
 class TaskManager:
-    """Gestionnaire de tâches pour gérer et exécuter les tâches d'une entité."""
-    def __init__(self, entity):
+    """Gestionnaire de tâches pour gérer et exécuter les tâches d'une entité.
+
+    Les tâches en attente sont dans un tas trié par (rang, -priorité, ordre d'ajout) : à priorité égale,
+    l'ordre d'ajout est conservé. Le rang 0 est réservé aux tâches qui doivent passer avant toutes les
+    autres (suite d'une chaîne de tâches liées, tâche interrompue à reprendre). Les annulations et
+    changements de priorité marquent l'ancienne entrée comme supprimée au lieu de la chercher dans le tas.
+    """
+    REMOVED = None  # Marqueur d'une entrée supprimée du tas
+
+    def __init__(self, entity, **kwargs):
         self.entity = entity
-        self.tasks = []  # Liste de tâches pour l'entité
+        self.tasks = []  # Tas des entrées [rang, -priorité, ordre d'ajout, tâche]
+        self.entries = {}  # Tâche -> entrée du tas encore valide
+        self.counter = itertools.count()
         self.current_task = None
+        self.queued_cost = 0  # Somme des coûts en énergie des tâches en attente
+
+        self.__dict__.update(kwargs)
+        self.energy_budget = self.__dict__.get("energy_budget", None)  # Coût total admis en attente (None = illimité)
+
+    def push(self, task, rank=1):
+        """Insère une tâche dans le tas en O(log n)."""
+        entry = [rank, -task.priority, next(self.counter), task]
+        self.entries[task] = entry
+        self.queued_cost += task.energy_cost
+        heapq.heappush(self.tasks, entry)
+
+    def pop(self):
+        """Retire et retourne la tâche en tête du tas, ou None ; les entrées supprimées sont ignorées."""
+        while self.tasks:
+            task = heapq.heappop(self.tasks)[-1]
+            if task is not self.REMOVED:
+                del self.entries[task]
+                self.queued_cost -= task.energy_cost
+                return task
+        return None
+
+    def remove(self, task):
+        """Marque l'entrée d'une tâche en attente comme supprimée ; retourne son rang, ou None."""
+        entry = self.entries.pop(task, None)
+        if entry is None:
+            return None
+        entry[-1] = self.REMOVED
+        self.queued_cost -= task.energy_cost
+        return entry[0]
+
+    def can_admit(self, task):
+        """Vérifie que le coût en énergie de la tâche tient dans le budget des tâches en attente."""
+        return self.energy_budget is None or self.queued_cost + task.energy_cost <= self.energy_budget
 
     def add_task(self, task):
-        """Ajoute une tâche à la liste des tâches de l'entité."""
-        self.tasks.append(task)
-        self.tasks.sort(key=lambda t: t.priority, reverse=True)  # Tri par priorité
+        """Ajoute une tâche à la liste des tâches de l'entité ; retourne False si elle n'est pas admise."""
+        if not self.can_admit(task):
+            print(f"{self.entity} refuse la tâche {task.name} : budget d'énergie dépassé.")
+            return False
+        self.push(task)
+        return True
+
+    def reprioritize(self, task, priority):
+        """Change la priorité d'une tâche en attente (ou de la tâche en cours pour ses prochaines reprises)."""
+        task.priority = priority
+        rank = self.remove(task)
+        if rank is not None:
+            self.push(task, rank)
+
+    def cancel(self, task):
+        """Annule une tâche en attente ou la tâche en cours."""
+        if task is self.current_task:
+            self.current_task = None
+        else:
+            self.remove(task)
 
     def create_linked_tasks(self, tasks):
         """Ajoute un groupe de tâches liées."""
         for i in range(len(tasks) - 1):
             tasks[i].linked_tasks.append(tasks[i + 1])
-        self.add_task(tasks[0])  # Ajouter la première tâche du groupe à la liste
-        #print(f"liste des tâches: {self.tasks}")
+        return self.add_task(tasks[0])  # Ajouter la première tâche du groupe à la liste
 
     def is_busy(self):
         """Retourne True si une tâche est en cours, False sinon."""
-        return self.current_task is not None or bool(self.tasks)
+        return self.current_task is not None or bool(self.entries)
     
     def set_task_completed(self):
         """Marque la tâche actuelle comme complétée."""
@@ -65,33 +127,27 @@ class TaskManager:
 
     def execute_tasks(self, delta_time):
         """Exécute la tâche actuelle de l'entité."""
-        if not self.tasks:
-            return
-
         # Si aucune tâche n'est en cours, on prend la première tâche disponible
         if not self.current_task:
-            self.current_task = self.tasks[0]
-            print(f"{self.entity} commence la tâche: {self.current_task.name}")
-        else:
-            if self.current_task.interrupted:
-                print(f"{self.entity} a été interrompu dans la tâche: {self.current_task.name}")
-                self.tasks.insert(0, self.current_task)
-                self.current_task = None
+            self.current_task = self.pop()
+            if not self.current_task:
                 return
+            print(f"{self.entity} commence la tâche: {self.current_task.name}")
+        elif self.current_task.interrupted:
+            print(f"{self.entity} a été interrompu dans la tâche: {self.current_task.name}")
+            # La tâche sera reprise en premier
+            self.current_task.interrupted = False
+            self.push(self.current_task, rank=0)
+            self.current_task = None
+            return
         
         # Si la tâche est terminée, passe à la suivante
         if self.current_task.completed:
             if self.current_task.linked_tasks:
-                # Ajoute la prochaine tâche liée
-                self.tasks.insert(1, self.current_task.linked_tasks.pop(0))
-            self.tasks.pop(0)  # Retirer la tâche terminée
-            self.current_task = None
-
-        # Si plus aucune tâche n'est présente
-        if not self.tasks:
+                # La tâche liée suivante conserve sa place dans la chaîne : elle passe avant les autres
+                self.push(self.current_task.linked_tasks.pop(0), rank=0)
             self.current_task = None
             return
-        
-        if self.current_task:
-            # Exécute la tâche courante
-            self.current_task.execute(self.entity, delta_time)
\ No newline at end of file
+
+        # Exécute la tâche courante
+        self.current_task.execute(self.entity, delta_time)
@@ -0,0 +1,106 @@
+import math
+import numpy as np
+
+def get_passable_grid(biomes, chunk):
+    """Retourne la grille booléenne de franchissabilité du chunk, mise en cache sur celui-ci.
+
+    Les biomes infranchissables (eau, montagnes) arrêtent aussi les rayons de vision.
+    """
+    if chunk.passable_grid is None:
+        chunk.passable_grid = biomes.passable[biomes.get_chunk_ids(chunk)]
+    return chunk.passable_grid
+
+def build_window(world, x0, y0, size):
+    """Assemble la franchissabilité de la fenêtre [x0, x0 + size) x [y0, y0 + size) à partir des chunks."""
+    chunk_size = world.config['chunk_size']
+    window = np.zeros((size, size), dtype=bool)
+    for chunk_x in range(x0 // chunk_size, (x0 + size - 1) // chunk_size + 1):
+        for chunk_y in range(y0 // chunk_size, (y0 + size - 1) // chunk_size + 1):
+            grid = get_passable_grid(world.biomes, world.get_chunk(chunk_x, chunk_y))
+            left, top = chunk_x * chunk_size, chunk_y * chunk_size
+            x_start, x_end = max(x0, left), min(x0 + size, left + chunk_size)
+            y_start, y_end = max(y0, top), min(y0 + size, top + chunk_size)
+            window[x_start - x0:x_end - x0, y_start - y0:y_end - y0] = grid[x_start - left:x_end - left, y_start - top:y_end - top]
+    return window
+
+def cast_rays_batch(world, entities, step_angle=5, ranges=None, angles=None):
+    """Lance les rayons de vision de toutes les entités en un seul lot vectorisé (traversée DDA).
+
+    Retourne, pour chaque entité, un couple (tuiles visibles, points d'impact) : les tuiles visibles
+    sont un tableau (n, 2) de coordonnées globales, les points d'impact une liste de (x, y).
+    """
+    count = len(entities)
+    if count == 0:
+        return []
+    ranges = np.array(ranges if ranges is not None else [entity.vision_range for entity in entities], dtype=float)
+    angles = angles if angles is not None else [entity.view_angle for entity in entities]
+
+    # Une fenêtre de franchissabilité par entité, centrée sur sa tuile
+    radius = int(math.ceil(ranges.max())) + 1
+    size = 2 * radius + 1
+    positions = np.array([(entity.x, entity.y) for entity in entities], dtype=float)
+    window_origins = np.floor(positions).astype(int) - radius
+    windows = np.stack([build_window(world, int(x0), int(y0), size) for x0, y0 in window_origins])
+
+    # Directions de tous les rayons : rotation de la direction de chaque entité
+    owners, offsets = [], []
+    for index, angle in enumerate(angles):
+        half_angle = int(angle / 2)
+        ray_offsets = np.radians(np.arange(-half_angle, half_angle + 1, step_angle))
+        owners.append(np.full(len(ray_offsets), index))
+        offsets.append(ray_offsets)
+    owner = np.concatenate(owners)
+    offset = np.concatenate(offsets)
+    direction = np.array([entity.direction for entity in entities], dtype=float)[owner]
+    cos, sin = np.cos(offset), np.sin(offset)
+    dir_x = direction[:, 0] * cos - direction[:, 1] * sin
+    dir_y = direction[:, 0] * sin + direction[:, 1] * cos
+    origin_x, origin_y = positions[owner, 0], positions[owner, 1]
+    max_t = ranges[owner]
+
+    # Initialisation de la traversée DDA (Amanatides & Woo)
+    cell_x, cell_y = np.floor(origin_x).astype(int), np.floor(origin_y).astype(int)
+    step_x, step_y = np.where(dir_x >= 0, 1, -1), np.where(dir_y >= 0, 1, -1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        delta_x = np.where(dir_x != 0, np.abs(1 / dir_x), np.inf)
+        delta_y = np.where(dir_y != 0, np.abs(1 / dir_y), np.inf)
+        next_x = np.where(dir_x != 0, (cell_x + (step_x > 0) - origin_x) / dir_x, np.inf)
+        next_y = np.where(dir_y != 0, (cell_y + (step_y > 0) - origin_y) / dir_y, np.inf)
+    hit_t = max_t.copy()
+    t = np.zeros(len(owner))
+    active = np.ones(len(owner), dtype=bool)
+    visible = np.zeros((count, size, size), dtype=bool)
+
+    for step in range(2 * size):
+        if not active.any():
+            break
+        rays = np.nonzero(active)[0]
+        local_x = np.clip(cell_x[rays] - window_origins[owner[rays], 0], 0, size - 1)
+        local_y = np.clip(cell_y[rays] - window_origins[owner[rays], 1], 0, size - 1)
+        visible[owner[rays], local_x, local_y] = True
+
+        # La tuile de départ ne bloque jamais la vue
+        blocked = ~windows[owner[rays], local_x, local_y] & (step > 0)
+        hit_t[rays[blocked]] = t[rays[blocked]]
+        active[rays[blocked]] = False
+
+        # Avancer chaque rayon actif jusqu'à la frontière de tuile la plus proche
+        rays = np.nonzero(active)[0]
+        along_x = next_x[rays] < next_y[rays]
+        ray_x, ray_y = rays[along_x], rays[~along_x]
+        t[ray_x] = next_x[ray_x]
+        cell_x[ray_x] += step_x[ray_x]
+        next_x[ray_x] += delta_x[ray_x]
+        t[ray_y] = next_y[ray_y]
+        cell_y[ray_y] += step_y[ray_y]
+        next_y[ray_y] += delta_y[ray_y]
+        active[rays] = t[rays] <= max_t[rays]
+
+    hits = np.stack([origin_x + dir_x * hit_t, origin_y + dir_y * hit_t], axis=1)
+
+    results = []
+    for index in range(count):
+        visible_tiles = np.argwhere(visible[index]) + window_origins[index]
+        hit_points = [tuple(point) for point in hits[owner == index].tolist()]
+        results.append((visible_tiles, hit_points))
+    return results